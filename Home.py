@@ -1,5 +1,6 @@
 import streamlit as st
-from PIL import Image
+
+from fome_zero.ui import load_logo
 
 # Configurar título da página
 st.set_page_config(
@@ -8,7 +9,7 @@ st.set_page_config(
     layout="wide"
     )
 
-image = Image.open('logo-inicio.jpg')
+image = load_logo('logo-inicio.jpg', 300)
 st.sidebar.image(image, width=300)
 
 # Título e subtítulo
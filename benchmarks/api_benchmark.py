@@ -0,0 +1,103 @@
+# Latência e vazão da API local (fome_zero/api.py) com clientes em threads
+#
+#   python benchmarks/api_benchmark.py [requisições] [clientes] [url]
+#
+# Sem url, sobe a API neste processo numa porta livre. Três rodadas com os
+# mesmos filtros aleatórios: fria (cada resposta é calculada), quente (respostas
+# do cache) e condicional (If-None-Match com a ETag recebida, respondida com 304).
+
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from fome_zero.api import API_ENDPOINTS, make_server
+
+PERCENTILES = [50, 95, 99]
+
+def random_requests(countries, count, seed=0):
+    # Caminhos com um subconjunto de países e uma faixa de notas
+    rng = np.random.default_rng(seed)
+    paths = []
+    for _ in range(count):
+        chosen = rng.choice(countries, int(rng.integers(1, len(countries) + 1)), replace=False)
+        low = round(float(rng.integers(0, 45)) / 10, 1)
+        high = round(float(rng.integers(low * 10, 51)) / 10, 1)
+        query = urlencode([('paises', country) for country in chosen] + [('nota', f'{low},{high}')])
+        paths.append(f"{list(API_ENDPOINTS)[int(rng.integers(len(API_ENDPOINTS)))]}?{query}")
+    return paths
+
+def run_client(host, port, paths, etags, conditional, results):
+    # Uma conexão persistente por cliente
+    connection = http.client.HTTPConnection(host, port)
+    for path in paths:
+        headers = {'If-None-Match': etags[path]} if conditional and path in etags else {}
+        start = time.perf_counter()
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        results.append((time.perf_counter() - start, response.status))
+        etags[path] = response.getheader('ETag')
+    connection.close()
+
+def run_round(host, port, paths, clients, etags, conditional=False):
+    results = []
+    threads = [threading.Thread(target=run_client, args=(host, port, paths[i::clients], etags, conditional, results))
+               for i in range(clients)]
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+
+    latencies = np.array([seconds for seconds, _ in results]) * 1000
+    statuses = {}
+    for _, status in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        'requests': len(results),
+        'latency_ms': {f'p{p}': float(np.percentile(latencies, p)) for p in PERCENTILES},
+        'throughput': len(results) / wall,
+        'statuses': statuses,
+    }
+
+def main(count=200, clients=4, url=None):
+    server = None
+    if url is None:
+        server = make_server(port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+    host, port = urlsplit(url).hostname, urlsplit(url).port
+
+    # Os países vêm da própria API, como um cliente externo faria
+    connection = http.client.HTTPConnection(host, port)
+    connection.request('GET', '/paises')
+    countries = [row['country_name'] for row in json.loads(connection.getresponse().read())['dados']]
+    connection.close()
+
+    paths = random_requests(countries, count)
+    etags = {}
+    print(f"{'rodada':<14}{'requisições':>12}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'req/s':>10}  status")
+    for name, conditional in (('fria', False), ('quente', False), ('condicional', True)):
+        result = run_round(host, port, paths, clients, etags, conditional)
+        latency = result['latency_ms']
+        print(f"{name:<14}{result['requests']:>12}{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['p99']:>10.2f}"
+              f"{result['throughput']:>10.1f}  {result['statuses']}")
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+         sys.argv[3] if len(sys.argv) > 3 else None)
@@ -0,0 +1,91 @@
+# Compara a limpeza linha a linha (apply) com a limpeza vetorizada
+#
+#   python benchmarks/bench_cleaning.py [caminho do csv] [fatores de escala...]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import inflection
+import pandas as pd
+
+from fome_zero.data import COLORS, COUNTRIES, DATA_PATH, clean_data
+from fome_zero.snapshot import optimize_dtypes
+
+#-------------------------------------------------------------------------------
+# Limpeza original, com apply por linha
+#-------------------------------------------------------------------------------
+
+def country_name(country_id):
+    return COUNTRIES.get(country_id, "Unknown")
+
+def create_price_tye(price_range):
+    if price_range == 1:
+        return "cheap"
+    elif price_range == 2:
+        return "normal"
+    elif price_range == 3:
+        return "expensive"
+    else:
+        return "gourmet"
+
+def color_name(color_code):
+    return COLORS.get(color_code, "unknown")
+
+def rename_columns(dataframe):
+    df = dataframe.copy()
+    title = lambda x: inflection.titleize(x)
+    snakecase = lambda x: inflection.underscore(x)
+    spaces = lambda x: x.replace(" ", "")
+    cols_old = list(df.columns)
+    cols_old = list(map(title, cols_old))
+    cols_old = list(map(spaces, cols_old))
+    cols_new = list(map(snakecase, cols_old))
+    df.columns = cols_new
+    return df
+
+def legacy_clean_data(df):
+    df['Country Name'] = df['Country Code'].apply(country_name)
+    df['Price_Tye'] = df['Price range'].apply(create_price_tye)
+    df['Color_Name'] = df['Rating color'].apply(color_name)
+    df = rename_columns(df)
+    df.dropna(inplace=True)
+    df.reset_index(drop=True, inplace=True)
+    if "cuisines" in df.columns:
+        df["all_cuisines"] = df["cuisines"]
+        df["cuisines"] = df["cuisines"].apply(lambda x: x.split(",")[0] if isinstance(x, str) else x)
+    return optimize_dtypes(df)
+
+#-------------------------------------------------------------------------------
+# Benchmark
+#-------------------------------------------------------------------------------
+
+def timeit(func, raw, repeat=3):
+    times = []
+    for _ in range(repeat):
+        frame = raw.copy()
+        start = time.perf_counter()
+        result = func(frame)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def main(csv_path, factors):
+    raw = pd.read_csv(csv_path)
+
+    print(f"{'linhas':>10}{'apply (s)':>12}{'vetorizado (s)':>16}{'aceleração':>12}")
+    for factor in factors:
+        scaled = pd.concat([raw] * factor, ignore_index=True)
+        legacy_time, expected = timeit(legacy_clean_data, scaled)
+        vector_time, result = timeit(clean_data, scaled)
+
+        # A saída precisa ser idêntica à da limpeza original
+        pd.testing.assert_frame_equal(result, expected)
+
+        print(f"{len(scaled):>10}{legacy_time:>12.4f}{vector_time:>16.4f}{legacy_time / vector_time:>11.1f}x")
+
+if __name__ == '__main__':
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    factors = [int(arg) for arg in sys.argv[2:]] or [1, 10, 100]
+    main(csv_path, factors)
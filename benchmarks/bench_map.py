@@ -0,0 +1,48 @@
+# Tempo de construção e tamanho do HTML do mapa: modo clássico, modo rápido e
+# área visível (visão inicial, com o índice espacial já construído)
+#
+#   python benchmarks/bench_map.py [fatores de escala...]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from fome_zero.data import load_and_clean_data
+from fome_zero.maps import build_map, create_base_map, create_viewport_layer
+from fome_zero.spatial import DEFAULT_VIEW, build_grid_index, viewport_selection
+
+# O modo clássico fica impraticável bem antes do rápido
+MAX_MARKER_ROWS = 10_000
+
+def viewport_map(df, index):
+    bounds, zoom = DEFAULT_VIEW
+    positions, clusters = viewport_selection(index, bounds, zoom)
+    m = create_base_map()
+    create_viewport_layer(df.iloc[positions], clusters).add_to(m)
+    return m
+
+def measure(df, mode):
+    index = build_grid_index(df) if mode == 'viewport' else None
+    start = time.perf_counter()
+    m = viewport_map(df, index) if mode == 'viewport' else build_map(df, mode)
+    html = m.get_root().render()
+    return time.perf_counter() - start, len(html.encode('utf-8'))
+
+def main(factors):
+    df = load_and_clean_data()
+
+    print(f"{'linhas':>10}{'modo':>10}{'tempo (s)':>12}{'HTML (MB)':>12}")
+    for factor in factors:
+        scaled = pd.concat([df] * factor, ignore_index=True)
+        for mode in ('markers', 'fast', 'viewport'):
+            if mode == 'markers' and len(scaled) > MAX_MARKER_ROWS:
+                continue
+            seconds, size = measure(scaled, mode)
+            print(f"{len(scaled):>10}{mode:>10}{seconds:>12.3f}{size / 1024 ** 2:>12.2f}")
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1, 10, 70])
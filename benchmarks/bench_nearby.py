@@ -0,0 +1,64 @@
+# Busca de restaurantes próximos: laço com haversine() por linha x NumPy + índice
+#
+#   python benchmarks/bench_nearby.py [fatores de escala...]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from haversine import haversine
+
+from fome_zero.data import load_and_clean_data
+from fome_zero.geo import haversine_km, nearest_positions
+from fome_zero.spatial import GridIndex
+
+# Consultas em cidades de densidades diferentes
+QUERIES = [(28.6139, 77.2090), (-23.5505, -46.6333), (40.7128, -74.0060), (-33.8688, 151.2093)]
+K = 10
+RADIUS_KM = 5.0
+
+def naive_nearest(df, latitude, longitude, k):
+    distances = [haversine((latitude, longitude), (lat, lon)) for lat, lon in zip(df['latitude'], df['longitude'])]
+    return np.sort(distances)[:k]
+
+def best_time(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def main(factors):
+    df = load_and_clean_data()
+
+    print(f"{'linhas':>10}{'laço (ms)':>12}{'numpy (ms)':>12}{'índice k (ms)':>15}{'índice raio (ms)':>18}")
+    for factor in factors:
+        scaled = pd.concat([df] * factor, ignore_index=True)
+        index = GridIndex(scaled['latitude'], scaled['longitude'])
+        latitudes, longitudes = index.latitude, index.longitude
+
+        naive, vector, nearest, radius = [], [], [], []
+        for latitude, longitude in QUERIES:
+            seconds, expected = best_time(lambda: naive_nearest(scaled, latitude, longitude, K), repeat=1)
+            naive.append(seconds)
+
+            seconds, distances = best_time(lambda: np.sort(haversine_km(latitude, longitude, latitudes, longitudes))[:K])
+            vector.append(seconds)
+
+            seconds, (_, found) = best_time(lambda: nearest_positions(index, latitude, longitude, k=K))
+            nearest.append(seconds)
+            assert np.allclose(found, expected) and np.allclose(distances, expected)
+
+            seconds, _ = best_time(lambda: nearest_positions(index, latitude, longitude, radius_km=RADIUS_KM, k=None))
+            radius.append(seconds)
+
+        print(f"{len(scaled):>10}{np.mean(naive) * 1000:>12.1f}{np.mean(vector) * 1000:>12.2f}"
+              f"{np.mean(nearest) * 1000:>15.2f}{np.mean(radius) * 1000:>18.2f}")
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1, 10, 70])
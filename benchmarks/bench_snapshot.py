@@ -0,0 +1,50 @@
+# Compara o carregamento do CSV com o snapshot Parquet: tempo e memória
+#
+#   python benchmarks/bench_snapshot.py [caminho do csv] [repetições]
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from fome_zero.data import DATA_PATH, clean_data
+from fome_zero.snapshot import read_snapshot, write_snapshot
+
+def timeit(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+def main(csv_path, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_file = os.path.join(tmp, 'zomato.parquet')
+
+        csv_time, df_csv = timeit(lambda: clean_data(pd.read_csv(csv_path)), repeat)
+        write_snapshot(df_csv, snapshot_file)
+        snapshot_time, df_snapshot = timeit(lambda: read_snapshot(snapshot_file), repeat)
+
+        # Dataset como era antes dos tipos otimizados (tudo object/int64)
+        df_objects = df_csv.astype({col: 'object' for col in df_csv.select_dtypes('category').columns})
+        df_objects = df_objects.astype({col: 'int64' for col in df_objects.select_dtypes('integer').columns})
+
+        pd.testing.assert_frame_equal(df_csv, df_snapshot)
+
+        print(f"Linhas: {len(df_csv)}")
+        print(f"{'':<22}{'tempo (s)':>12}{'memória (MB)':>15}{'arquivo (MB)':>15}")
+        print(f"{'CSV (object dtypes)':<22}{'':>12}{memory_mb(df_objects):>15.2f}{'':>15}")
+        print(f"{'CSV + limpeza':<22}{csv_time:>12.4f}{memory_mb(df_csv):>15.2f}{os.path.getsize(csv_path) / 1024 ** 2:>15.2f}")
+        print(f"{'Snapshot Parquet':<22}{snapshot_time:>12.4f}{memory_mb(df_snapshot):>15.2f}{os.path.getsize(snapshot_file) / 1024 ** 2:>15.2f}")
+        print(f"Aceleração na carga: {csv_time / snapshot_time:.1f}x")
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else DATA_PATH, int(sys.argv[2]) if len(sys.argv) > 2 else 5)
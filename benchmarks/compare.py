@@ -0,0 +1,32 @@
+# Compara dois resultados de benchmarks/run_suite.py etapa a etapa
+#
+#   python benchmarks/compare.py <antes.json> <depois.json> [tolerância]
+#
+# Sai com código 1 quando alguma etapa ficou mais lenta que a tolerância
+# (padrão 1.2, ou seja, 20% mais lenta).
+
+import json
+import sys
+
+def load_stages(file_path):
+    with open(file_path, encoding='utf-8') as f:
+        report = json.load(f)
+    stages = {(run['rows'], stage): seconds for run in report['runs'] for stage, seconds in run['stages'].items()}
+    return report.get('commit'), stages
+
+def main(before_path, after_path, tolerance=1.2):
+    before_commit, before = load_stages(before_path)
+    after_commit, after = load_stages(after_path)
+
+    print(f"{'linhas':>10}  {'etapa':<26}{before_commit or 'antes':>12}{after_commit or 'depois':>12}{'razão':>9}")
+    regressions = 0
+    for key in sorted(before.keys() & after.keys()):
+        ratio = after[key] / before[key] if before[key] else float('inf')
+        flag = '  <- mais lento' if ratio > tolerance else ''
+        regressions += ratio > tolerance
+        print(f"{key[0]:>10}  {key[1]:<26}{before[key]:>12.4f}{after[key]:>12.4f}{ratio:>9.2f}{flag}")
+    return regressions
+
+if __name__ == '__main__':
+    tolerance = float(sys.argv[3]) if len(sys.argv) > 3 else 1.2
+    sys.exit(1 if main(sys.argv[1], sys.argv[2], tolerance) else 0)
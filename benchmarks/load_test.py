@@ -0,0 +1,154 @@
+# Teste de carga: N sessões simultâneas navegando pelas páginas com filtros
+# aleatórios, via AppTest. Cada sessão roda em um processo próprio.
+#
+#   python benchmarks/load_test.py [sessões] [reruns por sessão] [linhas] [saída.json]
+#
+#   sessões: lista separada por vírgulas (padrão 1,5,10)
+#   linhas:  0 usa o dataset do repositório; outro valor (ex.: 100k) gera um
+#            CSV sintético com benchmarks/synthetic.py
+
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+PAGES = [
+    'Home.py',
+    'pages/1_🏁Start.py',
+    'pages/2_🌎Country.py',
+    'pages/3_🌆Cities.py',
+    'pages/4_🍔Cuisines.py',
+]
+
+PERCENTILES = [50, 95, 99]
+
+def peak_rss_mb():
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def random_subset(options, rng):
+    size = int(rng.integers(1, len(options) + 1))
+    return [options[i] for i in sorted(rng.choice(len(options), size, replace=False))]
+
+def randomize_filters(at, rng):
+    if at.multiselect:
+        at.multiselect[0].set_value(random_subset(at.multiselect[0].options, rng))
+    if at.slider:
+        low = round(float(rng.integers(0, 45)) / 10, 1)
+        high = round(float(rng.integers(low * 10, 51)) / 10, 1)
+        at.slider[0].set_value((low, high))
+    if len(at.multiselect) > 1:
+        at.multiselect[1].set_value(random_subset(at.multiselect[1].options, rng))
+
+def run_session(session_id, reruns, seed, barrier, results):
+    from streamlit.testing.v1 import AppTest
+
+    # O AppTest resolve caminhos relativos (logos) a partir do diretório atual
+    os.chdir(ROOT)
+    rng = np.random.default_rng(seed + session_id)
+
+    # Primeira renderização de cada página fora da medição, como uma sessão
+    # que já está aberta quando a carga começa
+    apps, first_renders = {}, []
+    for page in PAGES:
+        start = time.perf_counter()
+        apps[page] = AppTest.from_file(os.path.join(ROOT, page), default_timeout=600).run()
+        first_renders.append(time.perf_counter() - start)
+
+    barrier.wait()
+    cpu_start = cpu_seconds()
+    latencies, errors = [], 0
+    for _ in range(reruns):
+        at = apps[PAGES[int(rng.integers(len(PAGES)))]]
+        randomize_filters(at, rng)
+        start = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - start)
+        errors += len(at.exception)
+
+    results.put({
+        'first_renders': first_renders,
+        'latencies': latencies,
+        'errors': errors,
+        'peak_rss_mb': peak_rss_mb(),
+        'cpu_seconds': cpu_seconds() - cpu_start,
+    })
+
+def run_level(sessions, reruns, seed):
+    # O AppTest usa um Runtime global por processo e não roda em paralelo em
+    # threads; cada sessão simulada ganha o seu processo
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(sessions + 1)
+    queue = context.Queue()
+    workers = [context.Process(target=run_session, args=(i, reruns, seed, barrier, queue)) for i in range(sessions)]
+    for worker in workers:
+        worker.start()
+
+    barrier.wait()
+    wall_start = time.perf_counter()
+    results = [queue.get() for _ in workers]
+    wall = time.perf_counter() - wall_start
+    for worker in workers:
+        worker.join()
+
+    latencies = np.array([t for result in results for t in result['latencies']])
+    cpu = sum(result['cpu_seconds'] for result in results)
+    return {
+        'sessions': sessions,
+        'reruns': len(latencies),
+        'errors': sum(result['errors'] for result in results),
+        'first_render_mean': float(np.mean([t for result in results for t in result['first_renders']])),
+        'latency': {f'p{p}': float(np.percentile(latencies, p)) for p in PERCENTILES},
+        'throughput': len(latencies) / wall,
+        'peak_rss_mb': max(result['peak_rss_mb'] for result in results),
+        'total_rss_mb': sum(result['peak_rss_mb'] for result in results),
+        'cpu_seconds': cpu,
+        'cpu_per_session': cpu / sessions,
+        'cpu_utilization': cpu / wall,
+    }
+
+def main(levels, reruns, rows=0, output=None, seed=0):
+    with tempfile.TemporaryDirectory() as workdir:
+        if rows:
+            from synthetic import write_csv
+
+            # Herdado pelos processos das sessões antes de qualquer import de fome_zero
+            os.environ['FOME_ZERO_DATA'] = write_csv(rows, os.path.join(workdir, 'zomato.csv'), seed)
+
+        report = {'rows': rows or 'zomato.csv', 'reruns_per_session': reruns, 'levels': []}
+
+        print(f"{'sessões':>8}{'reruns':>8}{'p50 (s)':>10}{'p95 (s)':>10}{'p99 (s)':>10}{'reruns/s':>10}{'RSS pico (MB)':>15}{'CPU/sessão (s)':>16}{'erros':>7}")
+        for sessions in levels:
+            level = run_level(sessions, reruns, seed)
+            report['levels'].append(level)
+            latency = level['latency']
+            print(f"{sessions:>8}{level['reruns']:>8}{latency['p50']:>10.3f}{latency['p95']:>10.3f}{latency['p99']:>10.3f}"
+                  f"{level['throughput']:>10.2f}{level['peak_rss_mb']:>15.1f}{level['cpu_per_session']:>16.2f}{level['errors']:>7}")
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResultados gravados em {output}")
+    return report
+
+if __name__ == '__main__':
+    from synthetic import parse_rows
+
+    levels = [int(n) for n in (sys.argv[1] if len(sys.argv) > 1 else '1,5,10').split(',')]
+    reruns = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    rows = parse_rows(sys.argv[3]) if len(sys.argv) > 3 else 0
+    main(levels, reruns, rows, sys.argv[4] if len(sys.argv) > 4 else None)
@@ -0,0 +1,163 @@
+# Suíte de benchmarks dos caminhos críticos do dashboard, sobre CSVs sintéticos
+#
+#   python benchmarks/run_suite.py [tamanhos] [saída.json] [repetições]
+#
+#   tamanhos: lista separada por vírgulas, ex.: 10k,100k,1m,10m (padrão 10k,100k,1m)
+#
+# O JSON guarda o commit e o tempo mínimo de cada etapa por tamanho; dois
+# arquivos podem ser comparados com benchmarks/compare.py.
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from synthetic import parse_rows, write_csv
+
+from fome_zero.charts import bar_chart, cached_figure
+from fome_zero.cube import build_cube, select_cells
+from fome_zero.dashboard import RANKING_COLUMNS, preprocess_city_data, preprocess_country_data, preprocess_cuisine_data
+from fome_zero.data import clean_data
+from fome_zero.density import build_density
+from fome_zero.export import export_bytes
+from fome_zero.filters import FilterIndex
+from fome_zero.maps import build_map, create_base_map, create_density_layer
+from fome_zero.query import PandasQuery, SQLQuery, sql_literal
+from fome_zero.snapshot import read_snapshot, write_snapshot
+from fome_zero.spatial import DEFAULT_VIEW, build_grid_index
+from fome_zero.store import PartitionStore, ingest_csv
+
+DEFAULT_SIZES = '10k,100k,1m'
+
+# O mapa clássico (um marcador por linha) fica impraticável bem antes do resto
+MAX_MARKER_ROWS = 10_000
+
+# Filtros típicos do sidebar: três países, uma faixa de notas e parte das cidades
+COUNTRIES = ['India', 'Brazil', 'Turkey']
+RATING_RANGE = (3.0, 4.5)
+
+#-------------------------------------------------------------------------------
+# Benchmark
+#-------------------------------------------------------------------------------
+
+def timeit(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=ROOT).stdout.strip()
+    except OSError:
+        return None
+
+def run_size(rows, workdir, repeat):
+    csv_path = os.path.join(workdir, f'zomato_{rows}.csv')
+    snapshot_file = os.path.join(workdir, f'zomato_{rows}.parquet')
+    if not os.path.exists(csv_path):
+        write_csv(rows, csv_path)
+
+    results = {}
+
+    def measure(stage, func, times=repeat):
+        seconds, result = timeit(func, times)
+        results[stage] = seconds
+        print(f"{rows:>10}  {stage:<32}{seconds:>12.4f}")
+        return result
+
+    df = measure('load_clean_csv', lambda: clean_data(pd.read_csv(csv_path)), 1)
+    write_snapshot(df, snapshot_file)
+    measure('load_snapshot', lambda: read_snapshot(snapshot_file))
+
+    # Ingestão em blocos e leitura das partições de uma seleção (modo particionado)
+    store_dir = os.path.join(workdir, f'zomato_{rows}_store')
+    measure('ingest_store', lambda: ingest_csv(csv_path, store_dir), 1)
+    store = PartitionStore(store_dir)
+    measure('store_read', lambda: store.read(['latitude', 'longitude', 'restaurant_name'], countries=COUNTRIES, rating_range=RATING_RANGE))
+
+    cube = measure('build_cube', lambda: build_cube(df), 1)
+    index = measure('build_filter_index', lambda: FilterIndex(df), 1)
+    cities = index.options('city')[::3]
+
+    def sidebar_filter():
+        selection = index.select(df, countries=COUNTRIES, rating_range=RATING_RANGE, cities=cities)
+        cells = select_cells(cube, countries=COUNTRIES, rating_range=RATING_RANGE, cities=cities)
+        return selection, cells
+
+    selection, cells = measure('sidebar_filter', sidebar_filter)
+    restaurants = df[RANKING_COLUMNS]
+
+    # As mesmas funções das páginas nos dois backends: cubo/linhas em memória
+    # e SQL no DuckDB direto sobre o snapshot (uma consulta nova por medida,
+    # para não aproveitar os totais já calculados)
+    backends = {
+        '': lambda: PandasQuery(select_cells(cube), restaurants),
+        '_duckdb': lambda: SQLQuery(f"read_parquet({sql_literal(snapshot_file)})", {}),
+    }
+    for suffix, query in backends.items():
+        measure('preprocess_country_data' + suffix, lambda: preprocess_country_data(query()))
+        measure('preprocess_city_data' + suffix, lambda: preprocess_city_data(query()))
+        measure('preprocess_cuisine_data' + suffix, lambda: preprocess_cuisine_data(query()))
+
+    # Gráfico de um top 10: montado pelo px e devolvido pelo cache de figuras
+    top = preprocess_country_data(backends['']()).sort_values('Cidades', ascending=False).head(10)
+    chart = {'x': 'country_name', 'y': 'Cidades', 'text': 'Cidades', 'title': "Top 10 Países", 'labels': {'country_name': 'País'}}
+    measure('bar_chart_build', lambda: bar_chart(top, **chart))
+    measure('bar_chart_cached', lambda: cached_figure(bar_chart, top, **chart))
+
+    filtered = selection.frame()
+    measure('create_map_fast', lambda: build_map(filtered, 'fast').get_root().render(), 1)
+    if len(filtered) <= MAX_MARKER_ROWS:
+        measure('create_map_markers', lambda: build_map(filtered, 'markers').get_root().render(), 1)
+
+    # Mapa de densidade: grade de todos os níveis e a camada da visão inicial
+    grid = build_grid_index(df)
+    selected = selection.mask()
+
+    def density_map():
+        bounds, zoom = DEFAULT_VIEW
+        m = create_base_map()
+        create_density_layer(build_density(grid, selected, df, 'votes').cells(zoom, bounds)).add_to(m)
+        return m.get_root().render()
+
+    measure('density_map', density_map)
+
+    measure('export_csv', lambda: export_bytes(df, 'csv'), 1)
+    return {'rows': rows, 'selected_rows': len(selection), 'stages': results}
+
+def main(sizes, output=None, repeat=3):
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'repeat': repeat,
+        'runs': [],
+    }
+
+    print(f"{'linhas':>10}  {'etapa':<32}{'tempo (s)':>12}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in sizes:
+            report['runs'].append(run_size(rows, workdir, repeat))
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResultados gravados em {output}")
+    return report
+
+if __name__ == '__main__':
+    sizes = [parse_rows(size) for size in (sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SIZES).split(',')]
+    main(sizes, sys.argv[2] if len(sys.argv) > 2 else None, int(sys.argv[3]) if len(sys.argv) > 3 else 3)
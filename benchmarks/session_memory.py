@@ -0,0 +1,82 @@
+# Memória por sessão: o dataset é um só por processo e cada sessão guarda
+# apenas o estado dos filtros e as posições selecionadas
+#
+#   python benchmarks/session_memory.py [sessões...]   (padrão 1 10 100)
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from fome_zero.cube import load_cube, select_cells
+from fome_zero.data import load_and_clean_data
+from fome_zero.filters import load_filter_index, session_selection
+
+def random_filters(index, rng):
+    countries = index.options('country_name')
+    cities = index.options('city')
+    low = round(float(rng.integers(0, 40)) / 10, 1)
+    return {
+        'countries': list(rng.choice(countries, int(rng.integers(1, len(countries) + 1)), replace=False)),
+        'rating_range': (low, 5.0),
+        'cities': list(rng.choice(cities, int(rng.integers(1, len(cities) + 1)), replace=False)),
+    }
+
+def session_rerun(state, index, cube, filters):
+    # O que uma página faz a cada rerun: visão do dataset compartilhado,
+    # seleção guardada na sessão e células do cubo (descartadas no fim)
+    df1 = load_and_clean_data()
+    selection = session_selection(state, 'selecao', df1, index, **filters)
+    cells = select_cells(cube, **filters)
+    return selection, cells
+
+def legacy_rerun(filters):
+    # Como as páginas filtravam antes: uma cópia do dataset por passo
+    df1 = load_and_clean_data()
+    df1 = df1[df1['country_name'].isin(filters['countries'])]
+    df1 = df1[df1['aggregate_rating'].between(*filters['rating_range'])]
+    df1 = df1[df1['city'].isin(filters['cities'])]
+    return df1
+
+def measure(func):
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    return result, current - before, peak - before
+
+def main(levels, seed=0):
+    rng = np.random.default_rng(seed)
+    tracemalloc.start()
+
+    # Dataset, índice e cubo são do processo: carregados antes da medição
+    df = load_and_clean_data()
+    index = load_filter_index()
+    cube = load_cube()
+    shared = df.memory_usage(deep=True).sum()
+    print(f"Dataset compartilhado: {len(df)} linhas, {shared / 1024 ** 2:.2f} MB (uma vez por processo)")
+
+    print(f"\n{'sessões':>8}{'retido (KB)':>14}{'por sessão (KB)':>17}{'pico rerun (KB)':>17}{'pico antigo (KB)':>18}")
+    for sessions in levels:
+        filters = [random_filters(index, rng) for _ in range(sessions)]
+
+        # Cada sessão roda uma vez e guarda só o seu session_state
+        states, peaks = [], []
+        before = tracemalloc.get_traced_memory()[0]
+        for f in filters:
+            state = {}
+            _, _, peak = measure(lambda: session_rerun(state, index, cube, f))
+            peaks.append(peak)
+            states.append(state)
+        retained = tracemalloc.get_traced_memory()[0] - before
+
+        legacy_peaks = [measure(lambda: legacy_rerun(f))[2] for f in filters[:10]]
+        print(f"{sessions:>8}{retained / 1024:>14.1f}{retained / sessions / 1024:>17.2f}"
+              f"{np.mean(peaks) / 1024:>17.1f}{np.mean(legacy_peaks) / 1024:>18.1f}")
+        del states
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1, 10, 100])
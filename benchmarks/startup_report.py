@@ -0,0 +1,108 @@
+# Relatório de partida a frio: tempo de import por módulo e tempo da primeira
+# renderização de cada página, cada medida em um interpretador novo
+#
+#   python benchmarks/startup_report.py [saída.json]
+
+import glob
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependências pesadas e módulos do pacote, na ordem do relatório
+MODULES = [
+    'streamlit',
+    'pandas',
+    'numpy',
+    'pyarrow',
+    'plotly.express',
+    'folium',
+    'streamlit_folium',
+    'PIL.Image',
+    'haversine',
+    'inflection',
+    'fome_zero.ui',
+    'fome_zero.data',
+    'fome_zero.cube',
+    'fome_zero.filters',
+    'fome_zero.maps',
+]
+
+# Dependências que as páginas só deveriam carregar quando precisam. O pyarrow
+# fica de fora: o próprio pandas (2.2) já o importa na partida.
+LAZY_MODULES = ['folium', 'streamlit_folium', 'haversine', 'inflection', 'PIL.Image']
+
+IMPORT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+RENDER_SCRIPT = """
+import json, os, sys, time
+os.chdir({root!r})
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+
+start = time.perf_counter()
+at = AppTest.from_file({page!r}, default_timeout=600).run()
+first = time.perf_counter() - start
+
+start = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - start
+
+print(json.dumps({{
+    'first_render': first,
+    'rerun': rerun,
+    'exceptions': [str(e.value) for e in at.exception],
+    'lazy_loaded': [m for m in {lazy!r} if m in sys.modules],
+}}))
+"""
+
+def run_python(script):
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, cwd=ROOT)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return result.stdout.strip().splitlines()[-1]
+
+def import_time(module):
+    try:
+        return float(run_python(IMPORT_SCRIPT.format(root=ROOT, module=module)))
+    except RuntimeError:
+        return None
+
+def render_time(page):
+    return json.loads(run_python(RENDER_SCRIPT.format(root=ROOT, page=page, lazy=LAZY_MODULES)))
+
+def main(output=None):
+    report = {'python': sys.version.split()[0], 'imports': {}, 'pages': {}}
+
+    print(f"{'módulo':<22}{'import (s)':>12}")
+    for module in MODULES:
+        seconds = import_time(module)
+        report['imports'][module] = seconds
+        print(f"{module:<22}{'ausente' if seconds is None else f'{seconds:.3f}':>12}")
+
+    print()
+    print(f"{'página':<26}{'1ª render (s)':>15}{'rerun (s)':>11}  dependências carregadas")
+    pages = ['Home.py'] + sorted(os.path.relpath(p, ROOT) for p in glob.glob(os.path.join(ROOT, 'pages', '*.py')))
+    for page in pages:
+        result = render_time(page)
+        report['pages'][page] = result
+        status = ', '.join(result['lazy_loaded']) or '-'
+        if result['exceptions']:
+            status += f"  ERRO: {result['exceptions'][0]}"
+        print(f"{page:<26}{result['first_render']:>15.3f}{result['rerun']:>11.3f}  {status}")
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nRelatório gravado em {output}")
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,77 @@
+# Gera CSVs sintéticos com o mesmo esquema de dataset/zomato.csv
+#
+#   python benchmarks/synthetic.py <linhas> <saída.csv> [semente]
+#
+# As linhas são sorteadas do arquivo real, o que preserva a concentração por
+# país, cidade e culinária (e as culinárias ausentes). Cada restaurante recebe
+# um id novo e coordenadas levemente deslocadas, e uma fração das linhas é
+# cópia exata de outra, como os Restaurant ID repetidos do arquivo original.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.data import DATA_PATH
+
+# Mesma proporção de linhas repetidas do arquivo real (585 de 7527)
+DUPLICATE_RATE = 585 / 7527
+
+# Deslocamento das coordenadas, em graus (~500 m)
+JITTER_DEGREES = 0.005
+
+# Linhas geradas e gravadas por vez
+CHUNK_ROWS = 500_000
+
+# Sufixos aceitos nos tamanhos: 10k, 1m, 2.5m...
+SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+def parse_rows(value):
+    value = str(value).lower()
+    if value[-1:] in SUFFIXES:
+        return int(float(value[:-1]) * SUFFIXES[value[-1]])
+    return int(value)
+
+def load_source(source=DATA_PATH):
+    # Um exemplar de cada restaurante: as repetições são criadas à parte
+    return pd.read_csv(source).drop_duplicates('Restaurant ID', ignore_index=True)
+
+def generate_chunk(source, rows, first_id, rng):
+    duplicates = int(round(rows * DUPLICATE_RATE))
+    unique = rows - duplicates
+
+    chunk = source.iloc[rng.integers(0, len(source), unique)].reset_index(drop=True)
+    chunk['Restaurant ID'] = first_id + np.arange(unique)
+    chunk['Latitude'] = (chunk['Latitude'] + rng.normal(0, JITTER_DEGREES, unique)).clip(-90, 90)
+    chunk['Longitude'] = (chunk['Longitude'] + rng.normal(0, JITTER_DEGREES, unique)).clip(-180, 180)
+
+    copies = chunk.iloc[rng.integers(0, unique, duplicates)]
+    chunk = pd.concat([chunk, copies], ignore_index=True)
+    return chunk.iloc[rng.permutation(len(chunk))]
+
+def iter_chunks(rows, seed=0, source=DATA_PATH, chunk_rows=CHUNK_ROWS):
+    rng = np.random.default_rng(seed)
+    data = load_source(source)
+    first_id = int(data['Restaurant ID'].max()) + 1
+
+    for start in range(0, rows, chunk_rows):
+        size = min(chunk_rows, rows - start)
+        yield generate_chunk(data, size, first_id + start, rng)
+
+def generate(rows, seed=0, source=DATA_PATH):
+    return pd.concat(iter_chunks(rows, seed, source), ignore_index=True)
+
+def write_csv(rows, file_path, seed=0, source=DATA_PATH):
+    # Bloco a bloco, para que 10M de linhas não precisem caber na memória
+    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+        for i, chunk in enumerate(iter_chunks(rows, seed, source)):
+            chunk.to_csv(f, index=False, header=(i == 0))
+    return file_path
+
+if __name__ == '__main__':
+    rows = parse_rows(sys.argv[1])
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    print(f"{rows} linhas gravadas em {write_csv(rows, sys.argv[2], seed)}")
@@ -0,0 +1 @@
+# Pacote com a camada de dados e as funções compartilhadas entre as páginas do Fome Zero
@@ -0,0 +1,57 @@
+import pandas as pd
+
+#-------------------------------------------------------------------------------
+# Motor de agregação: uma única passada de groupby por dimensão
+#-------------------------------------------------------------------------------
+
+# Dimensões de agrupamento suportadas
+DIMENSIONS = {
+    'country': ['country_name'],
+    'city': ['city'],
+    'country_city': ['country_name', 'city'],
+    'cuisine': ['cuisines'],
+}
+
+# Métricas declarativas: nome -> (coluna, agregação)
+METRICS = {
+    'cidades': ('city', 'nunique'),
+    'restaurantes': ('restaurant_id', 'count'),
+    'restaurantes_unicos': ('restaurant_id', 'nunique'),
+    'culinarias': ('cuisines', 'nunique'),
+    'avaliacoes': ('votes', 'sum'),
+    'nota_soma': ('aggregate_rating', 'sum'),
+    'nota_media': ('aggregate_rating', 'mean'),
+    'custo_medio': ('average_cost_for_two', 'mean'),
+}
+
+def dimension_columns(dimension):
+    return DIMENSIONS[dimension] if isinstance(dimension, str) else list(dimension)
+
+def base_metrics(metrics):
+    # Cada métrica base é calculada uma única vez, mesmo que apareça em
+    # várias colunas de saída ou dentro de uma razão
+    base = []
+    for metric in metrics.values():
+        for name in (metric if isinstance(metric, tuple) else (metric,)):
+            if name not in base:
+                base.append(name)
+    return base
+
+def assemble(grouped, metrics):
+    # Monta as colunas de saída a partir das métricas base já agrupadas
+    summary = pd.DataFrame(index=grouped.index)
+    for column, metric in metrics.items():
+        if isinstance(metric, tuple):
+            numerator, denominator = metric
+            summary[column] = grouped[numerator] / grouped[denominator]
+        else:
+            summary[column] = grouped[metric]
+
+    return summary.reset_index()
+
+def summarize(df, dimension, metrics):
+    # metrics: coluna de saída -> nome da métrica, ou uma tupla
+    # (numerador, denominador) para métricas derivadas como uma razão
+    keys = dimension_columns(dimension)
+    grouped = df.groupby(keys, observed=True).agg(**{name: METRICS[name] for name in base_metrics(metrics)})
+    return assemble(grouped, metrics)
@@ -0,0 +1,176 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from fome_zero.caching import LRUCache, filter_key
+from fome_zero.dashboard import RANKING_COLUMNS, create_summary_table, preprocess_city_data, preprocess_country_data, preprocess_cuisine_data
+from fome_zero.query import open_query
+from fome_zero.report import plain
+from fome_zero.store import load_source
+
+#-------------------------------------------------------------------------------
+# API local em JSON com os agregados do dashboard
+#-------------------------------------------------------------------------------
+
+# Porta padrão, ao lado do Streamlit (8501)
+API_PORT = 8502
+
+# Parâmetro da URL -> filtro das consultas. Listas se repetem na URL
+# (?paises=India&paises=Brazil); a nota vai como "mínima,máxima".
+API_FILTERS = {
+    'paises': 'countries',
+    'nota': 'rating_range',
+    'cidades': 'cities',
+    'culinarias': 'cuisines',
+}
+
+# Respostas prontas por endpoint e filtros, compartilhadas entre as conexões
+API_CACHE_ENTRIES = 256
+
+_responses = LRUCache(max_entries=API_CACHE_ENTRIES, name='api')
+
+def parse_filters(query_string):
+    params = parse_qs(query_string, keep_blank_values=True)
+    filters = {}
+    for name, values in params.items():
+        if name not in API_FILTERS:
+            raise ValueError(f"Parâmetro desconhecido: {name}")
+        if name == 'nota':
+            try:
+                low, high = (float(value) for value in values[-1].split(','))
+            except ValueError:
+                raise ValueError(f"Faixa de nota inválida: {values[-1]}") from None
+            if not 0.0 <= low <= high <= 5.0:
+                raise ValueError(f"Faixa de nota inválida: {values[-1]}")
+            filters['rating_range'] = (low, high)
+        else:
+            # Parâmetro vazio (?paises=) é uma lista vazia, como um multiselect sem nada
+            filters[API_FILTERS[name]] = [value for value in values if value]
+    return filters
+
+def records(df):
+    df = df.astype({column: object for column in df.select_dtypes('category')})
+    return json.loads(df.to_json(orient='records', double_precision=15, force_ascii=False))
+
+def country_summary(query):
+    return records(preprocess_country_data(query))
+
+def city_summary(query):
+    return records(preprocess_city_data(query))
+
+def cuisine_extremes(query):
+    maior, menor, custo, nota, online = preprocess_cuisine_data(query)
+    return {
+        'maiores_avaliacoes': records(maior),
+        'menores_avaliacoes': records(menor),
+        'resumo': records(create_summary_table(custo, nota, online)),
+    }
+
+def cuisine_distribution(query):
+    return records(query.counts_by('cuisines').reset_index())
+
+# Caminho -> função que responde com a consulta dos filtros pedidos
+API_ENDPOINTS = {
+    '/totais': lambda query: plain(query.totals()),
+    '/paises': country_summary,
+    '/cidades': city_summary,
+    '/culinarias': cuisine_extremes,
+    '/culinarias/distribuicao': cuisine_distribution,
+}
+
+def build_response(path, source, filters):
+    # Só roda quando nenhuma requisição pediu estes filtros nesta versão
+    selection = source.select({}, 'api', columns=RANKING_COLUMNS, **filters)
+    query = open_query(source, rows=lambda: selection.frame(RANKING_COLUMNS), **filters)
+    payload = {'versao': source.version, 'filtros': plain(filters), 'dados': API_ENDPOINTS[path](query)}
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+def response_etag(path, version, filters):
+    # Mesma versão do dataset e mesmos filtros: mesmo corpo, mesma ETag. O
+    # cliente revalida sem que a consulta seja refeita.
+    return '"' + filter_key(version=version, path=path, **filters) + '"'
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+class APIHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 mantém a conexão aberta entre as requisições de um cliente
+    protocol_version = 'HTTP/1.1'
+
+    # Cabeçalhos e corpo saem em escritas separadas; com o Nagle ligado, o
+    # corpo espera o ACK atrasado do cliente (~40 ms por resposta)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/') or '/'
+        if path == '/':
+            return self.send_json(200, {'endpoints': list(API_ENDPOINTS), 'filtros': list(API_FILTERS)})
+        if path not in API_ENDPOINTS:
+            return self.send_json(404, {'erro': f"Endpoint desconhecido: {path}"})
+        # Filtros inválidos viram 400 e qualquer outra falha vira 500, sempre
+        # com corpo JSON: sem isso o cliente recebe a conexão fechada
+        try:
+            filters = parse_filters(url.query)
+            source = load_source()
+            etag = response_etag(path, source.version, filters)
+            if etag_matches(self.headers.get('If-None-Match'), etag):
+                return self.send_body(304, b'', etag)
+            body = _responses.get_or_build(etag, lambda: build_response(path, source, filters))
+        except (ValueError, KeyError) as error:
+            return self.send_json(400, {'erro': str(error)})
+        except Exception as error:
+            return self.send_json(500, {'erro': f"Erro interno: {type(error).__name__}: {error}"})
+        self.send_body(200, body, etag)
+
+    def send_json(self, status, payload):
+        self.send_body(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+    def send_body(self, status, body, etag=None):
+        self.send_response(status)
+        if etag is not None:
+            self.send_header('ETag', etag)
+            # O cliente pode guardar a resposta, mas revalida a cada uso
+            self.send_header('Cache-Control', 'no-cache')
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Sem uma linha no stderr por requisição
+        pass
+
+def make_server(host='127.0.0.1', port=API_PORT):
+    # Dataset e índices carregados antes da primeira requisição
+    load_source()
+    server = ThreadingHTTPServer((host, port), APIHandler)
+    server.daemon_threads = True
+    return server
+
+def api_stats():
+    return _responses.stats()
+
+#-------------------------------------------------------------------------------
+# python -m fome_zero.api [porta] [host]
+#-------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import sys
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else API_PORT
+    host = sys.argv[2] if len(sys.argv) > 2 else '127.0.0.1'
+
+    server = make_server(host, port)
+    print(f"{'api':<18}http://{host}:{server.server_port}/")
+    print(f"{'endpoints':<18}{', '.join(API_ENDPOINTS)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+#-------------------------------------------------------------------------------
+# Cache LRU por processo com estatísticas de uso
+#-------------------------------------------------------------------------------
+
+# Caches nomeados do processo, listados no painel de perfil
+_registry = {}
+
+class LRUCache:
+
+    # max_bytes limita também o tamanho somado das entradas, medido por
+    # sizeof (len, para bytes); uma entrada maior que o limite não é guardada
+    def __init__(self, max_entries=32, name=None, max_bytes=None, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._sizes = {}
+        self.hits = 0
+        self.misses = 0
+        self.build_seconds = 0.0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        if name is not None:
+            _registry[name] = self
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def get_or_build(self, key, builder):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+
+        # Constrói fora do lock para não bloquear as outras sessões
+        start = time.perf_counter()
+        value = builder()
+        seconds = time.perf_counter() - start
+
+        with self._lock:
+            self.build_seconds += seconds
+            size = self.sizeof(value) if self.max_bytes is not None else 0
+            if self.max_bytes is not None and size > self.max_bytes:
+                return value
+            if key in self._items:
+                self.nbytes -= self._sizes.pop(key)
+            self._items[key] = value
+            self._items.move_to_end(key)
+            self._sizes[key] = size
+            self.nbytes += size
+            while len(self._items) > self.max_entries or (self.max_bytes is not None and self.nbytes > self.max_bytes):
+                evicted, _ = self._items.popitem(last=False)
+                self.nbytes -= self._sizes.pop(evicted)
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._items),
+            'bytes': self.nbytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'build_seconds': self.build_seconds,
+            'mean_build_seconds': self.build_seconds / self.misses if self.misses else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.build_seconds = 0.0
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+def filter_key(**filters):
+    # Hash estável do estado dos filtros. Listas e conjuntos (multiselects)
+    # não dependem da ordem; tuplas (faixas do slider) mantêm a ordem.
+    normalized = {
+        name: sorted(map(str, value)) if isinstance(value, (list, set)) else value
+        for name, value in filters.items()
+    }
+    payload = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
@@ -0,0 +1,40 @@
+import hashlib
+import json
+
+import pandas as pd
+import plotly.express as px
+
+from fome_zero.caching import LRUCache
+
+#-------------------------------------------------------------------------------
+# Gráficos das páginas, com cache pelo conteúdo da tabela
+#-------------------------------------------------------------------------------
+
+# Figuras prontas, compartilhadas entre as sessões. Cada gráfico de página é
+# um top 10, então a entrada é pequena; o caro é o px montar a figura.
+FIGURE_CACHE_ENTRIES = 64
+
+_figures = LRUCache(max_entries=FIGURE_CACHE_ENTRIES, name='figuras')
+
+def bar_chart(dataframe, x, y, text, title, labels):
+    fig = px.bar(dataframe, x=x, y=y, text=text, title=title, labels=labels)
+    fig.update_traces(textposition='outside')
+    return fig
+
+def pie_chart(dataframe, values, names, title):
+    return px.pie(dataframe, values=values, names=names, title=title)
+
+def table_hash(dataframe):
+    # Valores e índice linha a linha, mais os nomes e tipos das colunas
+    digest = hashlib.sha1(pd.util.hash_pandas_object(dataframe, index=True).to_numpy().tobytes())
+    digest.update(json.dumps([[str(name), str(dtype)] for name, dtype in dataframe.dtypes.items()]).encode('utf-8'))
+    return digest.hexdigest()
+
+def cached_figure(builder, dataframe, **params):
+    # O st.plotly_chart copia a figura antes de serializar, então a mesma
+    # instância pode ser devolvida a várias sessões
+    key = (builder.__name__, table_hash(dataframe), json.dumps(params, sort_keys=True, default=str))
+    return _figures.get_or_build(key, lambda: builder(dataframe, **params))
+
+def figure_stats():
+    return _figures.stats()
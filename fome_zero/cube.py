@@ -0,0 +1,133 @@
+import numpy as np
+
+from fome_zero.aggregations import assemble, base_metrics, dimension_columns
+from fome_zero.data import DATA_PATH, load_derived
+
+#-------------------------------------------------------------------------------
+# Cubo pré-agregado: país x cidade x culinária x faixa de nota
+#-------------------------------------------------------------------------------
+
+CUBE_DIMENSIONS = ['country_name', 'city', 'cuisines', 'rating_bucket']
+
+# Faixas de 0.1 ponto, o mesmo passo do slider de classificação
+RATING_STEP = 0.1
+
+# Como cada métrica de aggregations.METRICS é respondida pelas parciais
+# aditivas das células: soma de uma parcial, contagem distinta de uma
+# dimensão do cubo, ou média como razão entre duas somas
+CUBE_METRICS = {
+    'cidades': ('nunique', 'city'),
+    'culinarias': ('nunique', 'cuisines'),
+    'restaurantes': ('sum', 'count'),
+    'restaurantes_unicos': ('sum', 'restaurants'),
+    'avaliacoes': ('sum', 'votes'),
+    'nota_soma': ('sum', 'rating_sum'),
+    'nota_media': ('mean', 'rating_sum'),
+    'custo_medio': ('mean', 'cost_sum'),
+    'online_entregas': ('sum', 'online_delivery'),
+}
+
+def rating_total(rating_sum):
+    # Notas têm uma casa decimal, então a soma exata é um número inteiro de
+    # décimos; arredondar remove o ruído da soma em ponto flutuante e deixa o
+    # resultado igual ao do backend SQL (query.SQL_METRICS)
+    return np.round(rating_sum, 1)
+
+def rating_bucket(ratings):
+    return np.rint(np.asarray(ratings) / RATING_STEP).astype('int16')
+
+def rating_buckets(rating_range):
+    # Pontas do slider arredondadas para a faixa de 0.1 ponto. O slider
+    # devolve valores como 3.0000000000000004; normalizados aqui, cubo,
+    # índice de filtros, partições e SQL escolhem os mesmos restaurantes.
+    low, high = (int(bucket) for bucket in rating_bucket(rating_range))
+    return low, high
+
+def rating_bounds(rating_range):
+    # A mesma faixa como intervalo de notas [mínimo, máximo), com meia faixa
+    # de folga dos dois lados
+    low, high = rating_buckets(rating_range)
+    return (low - 0.5) * RATING_STEP, (high + 0.5) * RATING_STEP
+
+def build_cube(df, first_seen=None):
+    # Parciais inteiras somadas em int64: acumuladas bloco a bloco (ou em
+    # datasets grandes) passam do limite do int32
+    cells = df[['country_name', 'city', 'cuisines', 'restaurant_id', 'votes', 'aggregate_rating', 'average_cost_for_two']].astype({'votes': 'int64', 'average_cost_for_two': 'int64'})
+    cells['rating_bucket'] = rating_bucket(df['aggregate_rating'])
+    cells['online_delivery'] = ((df['is_delivering_now'] == 1) & (df['has_online_delivery'] == 1)).astype('int64')
+
+    # Restaurantes distintos ficam aditivos contando cada id apenas na célula
+    # da sua primeira ocorrência (no dataset um id nunca muda de célula). A
+    # ingestão em blocos passa first_seen já descontando os blocos anteriores.
+    if first_seen is None:
+        first_seen = ~df['restaurant_id'].duplicated()
+    cells['first_seen'] = np.asarray(first_seen).astype('int64')
+
+    cube = cells.groupby(CUBE_DIMENSIONS, observed=True).agg(
+        count=('restaurant_id', 'size'),
+        restaurants=('first_seen', 'sum'),
+        votes=('votes', 'sum'),
+        rating_sum=('aggregate_rating', 'sum'),
+        cost_sum=('average_cost_for_two', 'sum'),
+        online_delivery=('online_delivery', 'sum'),
+    )
+    return cube.reset_index()
+
+def load_cube(file_path=DATA_PATH):
+    return load_derived(build_cube, file_path)
+
+def select_cells(cube, countries=None, rating_range=None, cities=None, cuisines=None):
+    # Filtra células, não linhas: o custo depende do tamanho do cubo
+    mask = np.ones(len(cube), dtype=bool)
+    if countries is not None:
+        mask &= cube['country_name'].isin(countries).to_numpy()
+    if cities is not None:
+        mask &= cube['city'].isin(cities).to_numpy()
+    if cuisines is not None:
+        mask &= cube['cuisines'].isin(cuisines).to_numpy()
+    if rating_range is not None:
+        low, high = rating_buckets(rating_range)
+        buckets = cube['rating_bucket'].to_numpy()
+        mask &= (buckets >= low) & (buckets <= high)
+    return cube[mask]
+
+#-------------------------------------------------------------------------------
+# Consultas sobre as células selecionadas
+#-------------------------------------------------------------------------------
+
+def summarize(cells, dimension, metrics):
+    # Mesma interface de aggregations.summarize, respondida pelas células
+    keys = dimension_columns(dimension)
+    base = base_metrics(metrics)
+
+    aggregations = {'count': ('count', 'sum')}
+    for name in base:
+        kind, column = CUBE_METRICS[name]
+        aggregations[name] = (column, kind if kind != 'mean' else 'sum')
+    grouped = cells.groupby(keys, observed=True).agg(**aggregations)
+
+    for name in base:
+        if CUBE_METRICS[name][1] == 'rating_sum':
+            grouped[name] = rating_total(grouped[name])
+        if CUBE_METRICS[name][0] == 'mean':
+            grouped[name] = grouped[name] / grouped['count']
+
+    return assemble(grouped, metrics)
+
+def totals(cells):
+    count = cells['count'].sum()
+    return {
+        'paises': cells['country_name'].nunique(),
+        'cidades': cells['city'].nunique(),
+        'culinarias': cells['cuisines'].nunique(),
+        'restaurantes': int(count),
+        'restaurantes_unicos': int(cells['restaurants'].sum()),
+        'avaliacoes': int(cells['votes'].sum()),
+        'nota_media': rating_total(cells['rating_sum'].sum()) / count if count else np.nan,
+        'custo_medio': cells['cost_sum'].sum() / count if count else np.nan,
+    }
+
+def counts_by(cells, column):
+    # Equivalente a value_counts() da coluna nas linhas selecionadas
+    counts = cells.groupby(column, observed=True)['count'].sum()
+    return counts.sort_values(ascending=False)
@@ -0,0 +1,194 @@
+import pandas as pd
+
+from fome_zero.charts import bar_chart, cached_figure, pie_chart
+from fome_zero.profiling import profiled
+
+#-------------------------------------------------------------------------------
+# Métricas, tabelas e gráficos das páginas, a partir de uma consulta
+# (query.open_query). Usados pelas páginas, pelos relatórios e pela API.
+#-------------------------------------------------------------------------------
+
+@profiled()
+def create_bar_chart(dataframe, x, y, text, title, labels):
+    # Refeito só quando a tabela ou os parâmetros mudam
+    return cached_figure(bar_chart, dataframe, x=x, y=y, text=text, title=title, labels=labels)
+
+@profiled()
+def create_pie_chart(dataframe, values, names, title):
+    return cached_figure(pie_chart, dataframe, values=values, names=names, title=title)
+
+#-------------------------------------------------------------------------------
+# Início
+#-------------------------------------------------------------------------------
+
+@profiled()
+def preprocess_start_data(consulta):
+    # Top 10 culinárias e restaurantes por país, nas colunas dos gráficos
+    culinarias = consulta.counts_by('cuisines').head(10).reset_index()
+    culinarias.columns = ['Culinária', 'Quantidade']
+    paises = consulta.counts_by('country_name').reset_index()
+    paises.columns = ['País', 'Quantidade']
+    return culinarias, paises
+
+def create_start_charts(culinarias, paises):
+    # Lista de (título da seção, figura)
+    fig_culinarias = create_bar_chart(
+        culinarias,
+        x='Culinária',
+        y='Quantidade',
+        title="Top 10 Tipos de Culinária Mais Frequentes",
+        text='Quantidade',
+        labels={'Quantidade': 'Número de Restaurantes', 'Culinária': 'Tipo de Culinária'}
+    )
+    fig_paises = create_pie_chart(
+        paises,
+        values='Quantidade',
+        names='País',
+        title="Participação dos Países no Fome Zero"
+    )
+    return [
+        ("Distribuição dos Tipos de Culinária", fig_culinarias),
+        ("Distribuição dos Restaurantes por País", fig_paises),
+    ]
+
+#-------------------------------------------------------------------------------
+# Países
+#-------------------------------------------------------------------------------
+
+@profiled()
+def calculate_country_metrics(consulta):
+    totais = consulta.totals()
+    return {
+        "paises_unicos": totais['paises'],
+        "cidades_unicas": totais['cidades'],
+        "restaurantes_totais": totais['restaurantes_unicos']
+    }
+
+# Métricas do resumo por país, respondidas pelo backend de consulta
+COUNTRY_SUMMARY = {
+    'Cidades': 'cidades',
+    'Restaurantes': 'restaurantes',
+    'Tipos de Culinária': 'culinarias',
+    'Avaliações': 'restaurantes',
+    'Nota Média': 'nota_media',
+    'Média_Preço_para_Dois': 'custo_medio',
+    'Média de Avaliações': ('nota_soma', 'restaurantes_unicos'),
+}
+
+SUMMARY_COLUMNS = ['country_name', 'Cidades', 'Restaurantes', 'Tipos de Culinária', 'Avaliações', 'Nota Média', 'Média_Preço_para_Dois']
+
+@profiled()
+def preprocess_country_data(consulta):
+    return consulta.summarize('country', COUNTRY_SUMMARY).round({'Média_Preço_para_Dois': 2, 'Média de Avaliações': 2})
+
+# Gráficos top 10 do resumo: (título da seção, coluna, título do gráfico, rótulo)
+COUNTRY_CHARTS = [
+    ("Top 10 Países com Mais Cidades Registradas", 'Cidades', "Top 10 Países", 'Quantidade de Cidades'),
+    ("Top 10 Países com Mais Restaurantes Registrados", 'Restaurantes', "Top 10 Restaurantes", 'Quantidade de Restaurantes'),
+    ("Top 10 Países com Maior Média de Avaliações", 'Média de Avaliações', "Top 10 Avaliações", 'Média de Avaliações'),
+    ("Top 10 Países com Maior Média de Preço para Dois", 'Média_Preço_para_Dois', "Top 10 Preços", 'Média Preço para Dois'),
+]
+
+def create_top_charts(resumo, charts, x, label):
+    # Lista de (título da seção, figura) com o top 10 de cada coluna
+    return [
+        (secao, create_bar_chart(resumo.sort_values(by=coluna, ascending=False).head(10), x=x, y=coluna, text=coluna,
+                                 title=titulo, labels={x: label, coluna: rotulo}))
+        for secao, coluna, titulo, rotulo in charts
+    ]
+
+def create_country_charts(resumo):
+    return create_top_charts(resumo, COUNTRY_CHARTS, 'country_name', 'País')
+
+#-------------------------------------------------------------------------------
+# Cidades
+#-------------------------------------------------------------------------------
+
+@profiled()
+def calculate_city_metrics(consulta):
+    totais = consulta.totals()
+    return {
+        "cidades_unicas": totais['cidades'],
+        "restaurantes_totais": totais['restaurantes_unicos'],
+        "tipos_culinaria": totais['culinarias']
+    }
+
+# Métricas do resumo por cidade, respondidas pelo backend de consulta
+CITY_SUMMARY = {
+    'Restaurantes': 'restaurantes_unicos',
+    'Tipos de Culinária': 'culinarias',
+    'Custo Médio para Dois': 'custo_medio',
+    'Avaliações': 'avaliacoes',
+}
+
+@profiled()
+def preprocess_city_data(consulta):
+    return consulta.summarize('city', CITY_SUMMARY).round({'Custo Médio para Dois': 2})
+
+CITY_CHARTS = [
+    ("Top 10 Cidades com Mais Restaurantes Registrados", 'Restaurantes', "Top 10 Restaurantes", 'Quantidade de Restaurantes'),
+    ("Top 10 Cidades com Maior Custo Médio para Dois", 'Custo Médio para Dois', "Top 10 Custos", 'Custo Médio para Dois'),
+    ("Top 10 Cidades com Mais Tipos de Culinária", 'Tipos de Culinária', "Top 10 Tipos de Culinária", 'Quantidade de Tipos de Culinária'),
+]
+
+def create_city_charts(resumo):
+    return create_top_charts(resumo, CITY_CHARTS, 'city', 'Cidade')
+
+#-------------------------------------------------------------------------------
+# Culinárias
+#-------------------------------------------------------------------------------
+
+# Colunas das linhas que os rankings leem (restaurante, grupos e nota)
+RANKING_COLUMNS = ['cuisines', 'city', 'country_name', 'restaurant_name', 'aggregate_rating']
+
+# Tamanho inicial dos rankings da página de culinárias
+RANKING_SIZE = 3
+
+@profiled()
+def calculate_cuisine_metrics(totais):
+    return {
+        "tipos_culinaria": totais['culinarias'],
+        "restaurantes_totais": totais['restaurantes_unicos'],
+        "media_geral_avaliacoes": round(totais['nota_media'], 2)
+    }
+
+def create_summary_table(*dataframes):
+    summary = dataframes[0]
+    for df in dataframes[1:]:
+        summary = pd.merge(summary, df, on='cuisines')
+    return summary
+
+@profiled()
+def preprocess_cuisine_data(consulta):
+    # Melhor e pior restaurante de cada culinária, sem ordenar a tabela inteira
+    maior_avaliacao, menor_avaliacao = consulta.top_and_bottom('cuisines')
+
+    # Médias e contagens por culinária vêm do backend de consulta; cada grupo
+    # é independente, então filtrar o resultado equivale a filtrar a entrada
+    custo_culinaria = consulta.summarize('cuisine', {'average_cost_for_two': 'custo_medio'})
+    custo_culinaria = custo_culinaria.sort_values(by='average_cost_for_two', ascending=False).round(2)
+
+    nota_culinaria = consulta.summarize('cuisine', {'aggregate_rating': 'nota_media'})
+    # isin em vez de != "Others": sem nenhuma linha, o pandas monta a coluna
+    # categórica com códigos int8 e a comparação escalar estoura
+    nota_culinaria = nota_culinaria[~nota_culinaria['cuisines'].isin(["Others"])]
+    nota_culinaria = nota_culinaria.sort_values(by='aggregate_rating', ascending=False).round(2)
+
+    mais_online_entregas = consulta.summarize('cuisine', {'restaurant_id': 'online_entregas'})
+    mais_online_entregas = mais_online_entregas[mais_online_entregas['restaurant_id'] > 0]
+    mais_online_entregas = mais_online_entregas.sort_values(by='restaurant_id', ascending=False)
+
+    return maior_avaliacao, menor_avaliacao, custo_culinaria, nota_culinaria, mais_online_entregas
+
+def create_distribution_chart(consulta):
+    # Top 10 culinárias por quantidade de restaurantes
+    culinaria_distribuicao = consulta.counts_by('cuisines').reset_index()
+    culinaria_distribuicao.columns = ['Tipo de Culinária', 'Quantidade']
+    return create_bar_chart(
+        culinaria_distribuicao.head(10),
+        x='Tipo de Culinária',
+        y='Quantidade',
+        text='Quantidade',
+        title="Top 10 Tipos de Culinária",
+        labels={'Tipo de Culinária': 'Tipo de Culinária', 'Quantidade': 'Quantidade de Restaurantes'}
+    )
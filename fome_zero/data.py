@@ -0,0 +1,228 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.profiling import profiled
+from fome_zero.snapshot import CATEGORICAL_COLUMNS, is_fresh, optimize_dtypes, read_snapshot, snapshot_path, write_snapshot
+
+# Com copy-on-write, cópias rasas do dataset compartilhado se comportam como
+# visões somente leitura: qualquer escrita em uma página gera uma cópia local.
+pd.set_option('mode.copy_on_write', True)
+
+#-------------------------------------------------------------------------------
+# Dicionários de apoio
+#-------------------------------------------------------------------------------
+
+# FOME_ZERO_DATA aponta para outro CSV com o mesmo esquema (ex.: um dataset
+# sintético maior, usado nos testes de carga)
+DATA_PATH = os.environ.get('FOME_ZERO_DATA') or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dataset', 'zomato.csv')
+
+COUNTRIES = {
+    1: "India",
+    14: "Australia",
+    30: "Brazil",
+    37: "Canada",
+    94: "Indonesia",
+    148: "New Zeland",
+    162: "Philippines",
+    166: "Qatar",
+    184: "Singapure",
+    189: "South Africa",
+    191: "Sri Lanka",
+    208: "Turkey",
+    214: "United Arab Emirates",
+    215: "England",
+    216: "United States of America",
+}
+
+COLORS = {
+    "3F7E00": "darkgreen",
+    "5BA829": "green",
+    "9ACD32": "lightgreen",
+    "CDD614": "orange",
+    "FFBA00": "red",
+    "CBCBC8": "darkred",
+    "FF7800": "darkred",
+}
+
+# Nomes finais das colunas do CSV, equivalentes a titleize + underscore do
+# inflection. Colunas fora do esquema conhecido ainda passam pelo inflection.
+COLUMN_NAMES = {
+    'Restaurant ID': 'restaurant_id',
+    'Restaurant Name': 'restaurant_name',
+    'Country Code': 'country_code',
+    'City': 'city',
+    'Address': 'address',
+    'Locality': 'locality',
+    'Locality Verbose': 'locality_verbose',
+    'Longitude': 'longitude',
+    'Latitude': 'latitude',
+    'Cuisines': 'cuisines',
+    'Average Cost for two': 'average_cost_for_two',
+    'Currency': 'currency',
+    'Has Table booking': 'has_table_booking',
+    'Has Online delivery': 'has_online_delivery',
+    'Is delivering now': 'is_delivering_now',
+    'Switch to order menu': 'switch_to_order_menu',
+    'Price range': 'price_range',
+    'Aggregate rating': 'aggregate_rating',
+    'Rating color': 'rating_color',
+    'Rating text': 'rating_text',
+    'Votes': 'votes',
+}
+
+# Tipo de preço por faixa de preço: 1, 2 e 3 têm nome próprio e qualquer
+# outro valor é "gourmet". PRICE_CODES[faixa] é o código em PRICE_TYPES.
+PRICE_TYPES = pd.Index(["cheap", "expensive", "gourmet", "normal"])
+PRICE_CODES = np.array([2, 0, 3, 1], dtype='int8')
+
+#-------------------------------------------------------------------------------
+# Funções de limpeza
+#-------------------------------------------------------------------------------
+
+def column_name(column):
+    if column in COLUMN_NAMES:
+        return COLUMN_NAMES[column]
+    import inflection
+    return inflection.underscore(inflection.titleize(column).replace(" ", ""))
+
+def rename_columns(dataframe):
+    return dataframe.rename(columns=column_name)
+
+def categorical_from_uniques(series, codes, names):
+    # Monta a coluna categórica a partir dos códigos do factorize e do nome
+    # calculado para cada valor distinto (valores ausentes continuam ausentes)
+    categories = pd.Index(sorted(set(names)))
+    lookup = categories.get_indexer(names)
+    new_codes = np.where(codes >= 0, lookup[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories), index=series.index)
+
+def map_categories(series, mapping, default):
+    # Mapeia apenas os valores distintos, não cada linha
+    codes, uniques = pd.factorize(series)
+    names = [mapping.get(value, default) for value in uniques]
+    return categorical_from_uniques(series, codes, names)
+
+def first_cuisine(series):
+    # Corta a lista de culinárias uma vez por categoria, não por linha
+    names = [value.split(",")[0] for value in series.cat.categories]
+    return categorical_from_uniques(series, series.cat.codes.to_numpy(), names)
+
+def create_price_tye(price_range):
+    values = price_range.to_numpy()
+    known = (values >= 1) & (values <= 3)
+    codes = PRICE_CODES[np.where(known, values, 0)]
+    return pd.Series(pd.Categorical.from_codes(codes, PRICE_TYPES), index=price_range.index)
+
+def clean_data(df):
+    # Renomeia as colunas
+    df = rename_columns(df)
+
+    # Adiciona o nome do país, o tipo de preço e o nome da cor
+    df['country_name'] = map_categories(df['country_code'], COUNTRIES, "Unknown")
+    df['price_tye'] = create_price_tye(df['price_range'])
+    df['color_name'] = map_categories(df['rating_color'], COLORS, "unknown")
+
+    # Categorias e tipos numéricos estreitos, iguais aos do snapshot. Converter
+    # antes do dropna também deixa a busca por ausentes bem mais barata.
+    df = optimize_dtypes(df)
+
+    # Remove valores ausentes e reseta o índice
+    df = df.dropna().reset_index(drop=True)
+
+    # Simplifica a coluna "cuisines" para apenas o primeiro tipo de culinária,
+    # guardando a lista completa em "all_cuisines"
+    if "cuisines" in df.columns:
+        df["all_cuisines"] = df["cuisines"]
+        df["cuisines"] = first_cuisine(df["cuisines"])
+
+    return df
+
+#-------------------------------------------------------------------------------
+# Cache do dataset por processo
+#-------------------------------------------------------------------------------
+
+# Um único dataset limpo por arquivo, compartilhado por todas as sessões do
+# processo. A chave inclui mtime e tamanho do CSV e o mtime do snapshot, para
+# invalidar quando o CSV mudar ou quando uma ingestão incremental regravar o
+# snapshot (inclusive em outro processo). Estruturas derivadas (cubo, índices)
+# ficam junto do dataset que as gerou.
+_cache = {}
+_cache_lock = threading.RLock()
+
+def file_signature(file_path):
+    stat = os.stat(file_path)
+    snapshot_file = snapshot_path(file_path)
+    snapshot_mtime = os.stat(snapshot_file).st_mtime_ns if os.path.exists(snapshot_file) else 0
+    return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, snapshot_mtime)
+
+def _load(file_path):
+    # Usa o snapshot colunar quando ele é mais novo que o CSV e o log de deltas
+    snapshot_file = snapshot_path(file_path)
+    if is_fresh(snapshot_file, file_path, CATEGORICAL_COLUMNS):
+        return read_snapshot(snapshot_file)
+
+    # Sem snapshot, o CSV e depois os deltas já aplicados, na mesma ordem
+    from fome_zero.ingest import replay_deltas
+
+    df = replay_deltas(clean_data(pd.read_csv(file_path)), file_path)
+    try:
+        write_snapshot(df, snapshot_file)
+    except OSError:
+        # Sistema de arquivos somente leitura: segue apenas com o CSV
+        pass
+    return df
+
+def _entry(file_path):
+    signature = file_signature(file_path)
+    path = signature[0]
+
+    with _cache_lock:
+        entry = _cache.get(path)
+        if entry is None or entry['signature'] != signature:
+            df = _load(file_path)
+            # A carga pode ter acabado de gravar o snapshot
+            entry = {'signature': file_signature(file_path), 'df': df, 'derived': {}}
+            _cache[path] = entry
+    return entry
+
+@profiled()
+def load_and_clean_data(file_path=DATA_PATH):
+    # Entrega uma visão rasa: as páginas filtram e reatribuem sem tocar no original
+    return _entry(file_path)['df'].copy(deep=False)
+
+def dataset_version(file_path=DATA_PATH):
+    # Identificador da versão do dataset carregado, para chaves de cache
+    _, mtime_ns, size, snapshot_mtime = _entry(file_path)['signature']
+    return f"{mtime_ns:x}-{size:x}-{snapshot_mtime:x}"
+
+def load_derived(builder, file_path=DATA_PATH):
+    # Constrói builder(df) uma vez por versão do dataset e reaproveita o resultado
+    entry = _entry(file_path)
+    key = (builder.__module__, builder.__qualname__)
+
+    with _cache_lock:
+        if key not in entry['derived']:
+            entry['derived'][key] = builder(entry['df'])
+        return entry['derived'][key]
+
+def replace_dataset(df, derived=None, file_path=DATA_PATH):
+    # Troca atômica de versão: grava o snapshot (arquivo temporário + rename) e
+    # instala o novo dataset com as estruturas derivadas já atualizadas. Reruns
+    # em andamento terminam com a versão antiga; os próximos veem a nova.
+    with _cache_lock:
+        write_snapshot(df, snapshot_path(file_path))
+        signature = file_signature(file_path)
+        entry = {
+            'signature': signature,
+            'df': df,
+            'derived': {(builder.__module__, builder.__qualname__): value for builder, value in (derived or {}).items()},
+        }
+        _cache[signature[0]] = entry
+    return dataset_version(file_path)
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,85 @@
+import numpy as np
+
+from fome_zero.caching import LRUCache
+from fome_zero.geo import longitude_spans
+from fome_zero.profiling import profiled
+
+#-------------------------------------------------------------------------------
+# Mapa de densidade: pontos contados numa grade no servidor
+#-------------------------------------------------------------------------------
+
+# Peso de cada restaurante na densidade: ele mesmo, os votos ou a nota
+DENSITY_WEIGHTS = {
+    'count': "Quantidade de restaurantes",
+    'votes': "Número de avaliações",
+    'aggregate_rating': "Nota",
+}
+
+# Níveis pré-calculados; cada zoom do mapa usa o nível mais próximo abaixo
+DENSITY_ZOOMS = (2, 4, 6, 8)
+
+# Células por "tile" do Leaflet (256 px): cerca de 8 px por célula na tela
+DENSITY_CELLS_PER_TILE = 32
+
+# Níveis prontos por estado dos filtros, compartilhados entre as sessões
+_densities = LRUCache(max_entries=16, name='densidade')
+
+def density_degrees(zoom):
+    return 360 / (2 ** max(zoom, 0) * DENSITY_CELLS_PER_TILE)
+
+def bin_points(latitude, longitude, degrees, weights=None):
+    # Mesmo resultado de um histogram2d numa grade global, mas esparso: nos
+    # níveis mais finos a grade densa teria dezenas de milhões de células
+    n_cols = int(np.ceil(360 / degrees)) + 1
+    rows = np.floor((np.clip(latitude, -90, 90) + 90) / degrees).astype('int64')
+    cols = np.floor((np.clip(longitude, -180, 180) + 180) / degrees).astype('int64')
+    cells, inverse = np.unique(rows * n_cols + cols, return_inverse=True)
+    values = np.bincount(inverse, weights=weights, minlength=len(cells)).astype('float64')
+
+    # Células no centro do retângulo; peso zero (nota 0, sem votos) não aparece
+    keep = values > 0
+    return {
+        'latitude': (cells[keep] // n_cols + 0.5) * degrees - 90,
+        'longitude': (cells[keep] % n_cols + 0.5) * degrees - 180,
+        'value': values[keep],
+    }
+
+class DensityLevels:
+
+    def __init__(self, latitude, longitude, weights=None, zooms=DENSITY_ZOOMS):
+        latitude = np.asarray(latitude, dtype='float64')
+        longitude = np.asarray(longitude, dtype='float64')
+        self.levels = {zoom: bin_points(latitude, longitude, density_degrees(zoom), weights) for zoom in zooms}
+
+    def level_for(self, zoom):
+        below = [level for level in self.levels if level <= zoom]
+        return max(below) if below else min(self.levels)
+
+    def cells(self, zoom, bounds=None):
+        # Células do nível do zoom, recortadas pela área visível
+        level = self.levels[self.level_for(zoom)]
+        if bounds is None:
+            return level
+        south, west, north, east = bounds
+        inside = (level['latitude'] >= south) & (level['latitude'] <= north)
+        longitude = level['longitude']
+        inside &= np.logical_or.reduce([(longitude >= low) & (longitude <= high) for low, high in longitude_spans(west, east)])
+        return {name: values[inside] for name, values in level.items()}
+
+    def nbytes(self):
+        return sum(values.nbytes for level in self.levels.values() for values in level.values())
+
+@profiled()
+def build_density(index, selected, df, weight='count'):
+    # index: spatial.GridIndex das linhas de df; selected: máscara da seleção
+    if weight not in DENSITY_WEIGHTS:
+        raise ValueError(f"Peso de densidade desconhecido: {weight}")
+    weights = None if weight == 'count' else df[weight].to_numpy(dtype='float64')[selected]
+    return DensityLevels(index.latitude[selected], index.longitude[selected], weights)
+
+def cached_density(key, builder):
+    # builder só é chamado quando nenhuma sessão calculou estes filtros e peso
+    return _densities.get_or_build(key, builder)
+
+def density_stats():
+    return _densities.stats()
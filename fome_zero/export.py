@@ -0,0 +1,77 @@
+import gzip
+import io
+import os
+
+from fome_zero.caching import LRUCache
+from fome_zero.profiling import profiled
+
+#-------------------------------------------------------------------------------
+# Exportação dos dados filtrados
+#-------------------------------------------------------------------------------
+
+# formato -> (rótulo, extensão do arquivo, mime)
+EXPORT_FORMATS = {
+    'csv': ("CSV", 'csv', 'text/csv'),
+    'csv.gz': ("CSV compactado (gzip)", 'csv.gz', 'application/gzip'),
+    'parquet': ("Parquet", 'parquet', 'application/vnd.apache.parquet'),
+}
+
+# Linhas serializadas por vez, para nunca montar o CSV inteiro como um texto
+CHUNK_ROWS = 50_000
+
+# Exportações prontas, compartilhadas entre as sessões do processo. O limite
+# é em bytes: poucas seleções grandes já ocupariam vários MB cada
+EXPORT_CACHE_MB = int(os.environ.get('FOME_ZERO_EXPORT_CACHE_MB') or 128)
+
+_exports = LRUCache(max_entries=16, name='exportações', max_bytes=EXPORT_CACHE_MB * 1024 ** 2)
+
+def iter_csv_chunks(df, chunk_rows=CHUNK_ROWS):
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=(start == 0)).encode('utf-8')
+
+def write_csv(df, fileobj, chunk_rows=CHUNK_ROWS):
+    for chunk in iter_csv_chunks(df, chunk_rows):
+        fileobj.write(chunk)
+
+def write_parquet(df, fileobj, chunk_rows=CHUNK_ROWS):
+    # pyarrow só é carregado quando alguém pede o formato Parquet
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Um row group por bloco de linhas, todos com o esquema do primeiro bloco
+    writer = None
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        table = pa.Table.from_pandas(chunk, schema=writer.schema if writer else None, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(fileobj, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+@profiled()
+def export_bytes(df, fmt, chunk_rows=CHUNK_ROWS):
+    buffer = io.BytesIO()
+    if fmt == 'csv':
+        write_csv(df, buffer, chunk_rows)
+    elif fmt == 'csv.gz':
+        with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=6, mtime=0) as compressed:
+            write_csv(df, compressed, chunk_rows)
+    elif fmt == 'parquet':
+        write_parquet(df, buffer, chunk_rows)
+    else:
+        raise ValueError(f"Formato de exportação desconhecido: {fmt}")
+    # Sem outras referências ao buffer, o getvalue entrega os bytes do
+    # próprio BytesIO em vez de copiá-los
+    return buffer.getvalue()
+
+def cached_export(key, fmt, build_df):
+    # build_df só é chamado quando esta combinação de filtros e formato ainda
+    # não foi exportada por nenhuma sessão
+    return _exports.get_or_build((key, fmt), lambda: export_bytes(build_df(), fmt))
+
+def is_cached(key, fmt):
+    return (key, fmt) in _exports
+
+def export_stats():
+    return _exports.stats()
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+from fome_zero.caching import filter_key
+from fome_zero.cube import rating_bounds
+from fome_zero.data import DATA_PATH, dataset_version, load_derived
+
+#-------------------------------------------------------------------------------
+# Motor de filtros pré-indexado
+#-------------------------------------------------------------------------------
+
+# Colunas com listas de posições por valor
+INDEXED_COLUMNS = ['country_name', 'city', 'cuisines']
+
+# Seleções guardadas por sessão: as páginas usam a mesma chave, então trocar
+# de página com os mesmos filtros reaproveita as posições
+SESSION_SELECTIONS = 4
+
+def position_dtype(size):
+    # Posições em int32 ocupam metade da memória enquanto cabem
+    return np.int32 if size < 2 ** 31 else np.int64
+
+def intersect_sorted(smaller, larger):
+    # Interseção de dois arrays ordenados de posições, em O(k log n)
+    if len(smaller) > len(larger):
+        smaller, larger = larger, smaller
+    found = np.searchsorted(larger, smaller)
+    found[found == len(larger)] = 0
+    return smaller[larger[found] == smaller] if len(larger) else larger
+
+class Postings:
+    # Posições das linhas de cada valor de uma coluna categórica, agrupadas
+    # por código e ordenadas dentro de cada grupo
+
+    def __init__(self, series):
+        values = series.astype('category') if not isinstance(series.dtype, pd.CategoricalDtype) else series
+        codes = values.cat.codes.to_numpy()
+        self.categories = values.cat.categories
+        self.order = np.argsort(codes, kind='stable').astype(position_dtype(len(codes)))
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.categories))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]) + (codes < 0).sum()
+        self.present = np.flatnonzero(counts)
+
+        # Valores na ordem de primeira aparição, como o unique() das páginas
+        first = np.full(len(self.categories), len(codes))
+        np.minimum.at(first, codes[codes >= 0], np.flatnonzero(codes >= 0))
+        self.options = self.categories[self.present[np.argsort(first[self.present], kind='stable')]].tolist()
+
+    def positions(self, values):
+        # None quando os valores cobrem a coluna inteira (nenhuma restrição)
+        codes = np.unique(self.categories.get_indexer(list(values)))
+        codes = codes[codes >= 0]
+        if np.isin(self.present, codes).all():
+            return None
+        slices = [self.order[self.offsets[code]:self.offsets[code + 1]] for code in codes]
+        return np.sort(np.concatenate(slices)) if slices else self.order[:0]
+
+class Selection:
+    # Seleção compacta de linhas: só as posições. As colunas são
+    # materializadas quando alguém pede por elas.
+
+    def __init__(self, df, positions):
+        self.df = df
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def column(self, name):
+        return self.df[name].iloc[self.positions]
+
+    def frame(self, columns=None):
+        df = self.df if columns is None else self.df[columns]
+        return df.iloc[self.positions]
+
+    def subset(self, positions):
+        # Posições de um recorte da seleção, no mesmo dataset
+        return Selection(self.df, positions)
+
+    def mask(self):
+        selected = np.zeros(len(self.df), dtype=bool)
+        selected[self.positions] = True
+        return selected
+
+class FilterIndex:
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.postings = {column: Postings(df[column]) for column in INDEXED_COLUMNS}
+
+        ratings = df['aggregate_rating'].to_numpy()
+        self.rating_order = np.argsort(ratings, kind='stable').astype(position_dtype(self.size))
+        self.sorted_ratings = ratings[self.rating_order]
+
+    def options(self, column):
+        return self.postings[column].options
+
+    def rating_positions(self, rating_range):
+        # Duas buscas binárias na permutação ordenada por nota
+        low, high = rating_bounds(rating_range)
+        start = np.searchsorted(self.sorted_ratings, low, side='left')
+        end = np.searchsorted(self.sorted_ratings, high, side='left')
+        if start == 0 and end == self.size:
+            return None
+        return np.sort(self.rating_order[start:end])
+
+    def select(self, df, countries=None, rating_range=None, cities=None, cuisines=None):
+        candidates = []
+        for column, values in (('country_name', countries), ('city', cities), ('cuisines', cuisines)):
+            if values is not None:
+                candidates.append(self.postings[column].positions(values))
+        if rating_range is not None:
+            candidates.append(self.rating_positions(rating_range))
+
+        candidates = sorted((positions for positions in candidates if positions is not None), key=len)
+        if not candidates:
+            return Selection(df, np.arange(self.size, dtype=position_dtype(self.size)))
+
+        # Começa pelo filtro mais seletivo: o custo acompanha o tamanho da seleção
+        positions = candidates[0]
+        for other in candidates[1:]:
+            positions = intersect_sorted(positions, other)
+        return Selection(df, positions)
+
+def session_selection(state, key, df, index, **filters):
+    # A sessão guarda só o estado dos filtros e as posições selecionadas; as
+    # linhas vêm do dataset compartilhado quando alguém pede. Reruns que não
+    # mexem nos filtros (mapa, rankings, download) reaproveitam as posições.
+    fingerprint = filter_key(version=dataset_version(), **filters)
+    cached = state.get(key)
+    if cached is None:
+        cached = state[key] = {}
+    if fingerprint in cached:
+        # A mais recente vai para o fim, e as mais antigas saem primeiro
+        cached[fingerprint] = cached.pop(fingerprint)
+    else:
+        cached[fingerprint] = index.select(df, **filters).positions
+        while len(cached) > SESSION_SELECTIONS:
+            del cached[next(iter(cached))]
+    return Selection(df, cached[fingerprint])
+
+def build_filter_index(df):
+    return FilterIndex(df)
+
+def load_filter_index(file_path=DATA_PATH):
+    return load_derived(build_filter_index, file_path)
@@ -0,0 +1,87 @@
+import numpy as np
+
+from fome_zero.profiling import profiled
+
+#-------------------------------------------------------------------------------
+# Busca de restaurantes próximos a um ponto
+#-------------------------------------------------------------------------------
+
+# Mesmo raio médio da Terra usado pelo pacote haversine
+EARTH_RADIUS_KM = 6371.0088
+
+# Quilômetros por grau de latitude
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+
+NEARBY_COLUMNS = ['restaurant_name', 'city', 'country_name', 'distance_km', 'aggregate_rating', 'average_cost_for_two', 'currency']
+
+def wrap_longitude(longitude):
+    # O Leaflet continua contando a longitude depois que o mapa passa da
+    # linha de data (ex.: 200 em vez de -160)
+    if -180.0 <= longitude <= 180.0:
+        return longitude
+    return (longitude + 180.0) % 360.0 - 180.0
+
+def longitude_spans(west, east):
+    # Faixas (oeste, leste) dentro de [-180, 180] que cobrem a área: a volta
+    # inteira, uma faixa só, ou duas quando a área cruza a linha de data
+    if east - west >= 360:
+        return [(-180.0, 180.0)]
+    west, east = wrap_longitude(west), wrap_longitude(east)
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    # Distância de um ponto a um array de pontos, toda em NumPy
+    lat1 = np.radians(latitude)
+    lat2 = np.radians(latitudes)
+    d_lat = lat2 - lat1
+    d_lon = np.radians(longitudes) - np.radians(longitude)
+    a = np.sin(d_lat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+def search_box(latitude, longitude, radius_km):
+    # Retângulo (sul, oeste, norte, leste) que contém o círculo do raio
+    d_lat = radius_km / KM_PER_DEGREE
+    cos_lat = np.cos(np.radians(min(abs(latitude) + d_lat, 90.0)))
+    d_lon = 360.0 if cos_lat < 1e-6 else radius_km / (KM_PER_DEGREE * cos_lat)
+    return latitude - d_lat, longitude - d_lon, latitude + d_lat, longitude + d_lon
+
+def candidate_positions(index, latitude, longitude, radius_km):
+    # O índice já divide um retângulo que cruza a linha de data
+    return index.query(*search_box(latitude, longitude, radius_km))
+
+def nearest_positions(index, latitude, longitude, radius_km=None, k=10, selected=None):
+    # Posições e distâncias dos k restaurantes mais próximos, opcionalmente
+    # limitados a um raio e à seleção dos filtros (máscara booleana)
+    search_radius = radius_km if radius_km is not None else 5.0
+    while True:
+        positions = candidate_positions(index, latitude, longitude, search_radius)
+        if selected is not None:
+            positions = positions[selected[positions]]
+
+        distances = haversine_km(latitude, longitude, index.latitude[positions], index.longitude[positions])
+        if radius_km is not None:
+            inside = distances <= radius_km
+            positions, distances = positions[inside], distances[inside]
+            break
+
+        # Sem raio: amplia a busca até ter k candidatos dentro do círculo
+        # pesquisado, ou até cobrir o planeta inteiro
+        if (distances <= search_radius).sum() >= k or search_radius >= np.pi * EARTH_RADIUS_KM:
+            break
+        search_radius *= 4
+
+    if k is not None and len(positions) > k:
+        nearest = np.argpartition(distances, k - 1)[:k]
+        positions, distances = positions[nearest], distances[nearest]
+
+    order = np.argsort(distances, kind='stable')
+    return positions[order], distances[order]
+
+@profiled()
+def nearby_restaurants(df, index, latitude, longitude, radius_km=None, k=10, selected=None):
+    positions, distances = nearest_positions(index, latitude, longitude, radius_km, k, selected)
+    result = df.iloc[positions].copy()
+    result['distance_km'] = distances.round(2)
+    return result[NEARBY_COLUMNS].reset_index(drop=True)
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+from fome_zero.cube import rating_total
+from fome_zero.data import DATA_PATH, load_derived
+
+#-------------------------------------------------------------------------------
+# Incidência restaurante x culinária (todas as culinárias listadas)
+#-------------------------------------------------------------------------------
+
+CUISINE_MODES = {
+    'primary': "Culinária principal",
+    'listed': "Qualquer culinária listada",
+}
+
+# Parciais por linha, as mesmas das células do cubo
+CELL_COLUMNS = ['count', 'restaurants', 'votes', 'rating_sum', 'cost_sum', 'online_delivery']
+
+def expand_ranges(starts, lengths):
+    # Concatena os intervalos [start, start + length) sem laço em Python
+    total = int(lengths.sum())
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + np.arange(total) - offsets
+
+def split_cuisines(value):
+    # "Italian, Pizza, Cafe" -> ["Italian", "Pizza", "Cafe"], sem repetições
+    names = []
+    for name in value.split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+class CuisineIncidence:
+    # Matriz esparsa em formato CSR: a linha i lista os ids das culinárias do
+    # restaurante i em indices[indptr[i]:indptr[i + 1]]
+
+    def __init__(self, df):
+        all_cuisines = df['all_cuisines']
+
+        # As listas são cortadas uma vez por valor distinto, não por linha
+        lists = [split_cuisines(value) for value in all_cuisines.cat.categories]
+        self.cuisines = pd.Index(sorted({name for names in lists for name in names}))
+        category_lengths = np.array([len(names) for names in lists], dtype='int64')
+        category_indptr = np.concatenate([[0], np.cumsum(category_lengths)])
+        category_indices = self.cuisines.get_indexer([name for names in lists for name in names])
+
+        codes = all_cuisines.cat.codes.to_numpy()
+        lengths = np.where(codes >= 0, category_lengths[codes], 0)
+        self.indptr = np.concatenate([[0], np.cumsum(lengths)])
+        self.indices = category_indices[expand_ranges(category_indptr[codes.clip(0)], lengths)].astype('int32')
+
+        # Valores por linha usados nos produtos esparsos
+        self.values = {
+            'count': np.ones(len(df)),
+            'restaurants': (~df['restaurant_id'].duplicated()).to_numpy(dtype='float64'),
+            'votes': df['votes'].to_numpy(dtype='float64'),
+            'rating_sum': df['aggregate_rating'].to_numpy(dtype='float64'),
+            'cost_sum': df['average_cost_for_two'].to_numpy(dtype='float64'),
+            'online_delivery': ((df['is_delivering_now'] == 1) & (df['has_online_delivery'] == 1)).to_numpy(dtype='float64'),
+        }
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def flags(self, cuisines=None):
+        # Vetor indicador das culinárias escolhidas (None = todas)
+        if cuisines is None:
+            return np.ones(len(self.cuisines))
+        flags = np.zeros(len(self.cuisines))
+        codes = self.cuisines.get_indexer(list(cuisines))
+        flags[codes[codes >= 0]] = 1
+        return flags
+
+    def entries(self, positions, cuisines=None):
+        # Posições em indices das culinárias das linhas selecionadas, opcionalmente
+        # só das culinárias escolhidas, e quantas entradas cada linha tem
+        starts = self.indptr[positions]
+        lengths = self.indptr[positions + 1] - starts
+        entries = expand_ranges(starts, lengths)
+        if cuisines is None:
+            return entries, lengths
+
+        kept = self.flags(cuisines)[self.indices[entries]] > 0
+        local_rows = np.repeat(np.arange(len(positions)), lengths)
+        return entries[kept], np.bincount(local_rows[kept], minlength=len(positions))
+
+    def filter(self, positions, cuisines):
+        # Linhas que listam alguma das culinárias: produto M[positions] @ f,
+        # com f indicando as culinárias escolhidas
+        flags = self.flags(cuisines)
+        if flags.all():
+            return positions
+
+        entries, lengths = self.entries(positions)
+        local_rows = np.repeat(np.arange(len(positions)), lengths)
+        hits = np.bincount(local_rows, weights=flags[self.indices[entries]], minlength=len(positions))
+        return positions[hits > 0]
+
+    def cells(self, positions, cuisines=None):
+        # Parciais por culinária: produto Mᵀ @ v restrito às linhas selecionadas,
+        # no mesmo formato das células do cubo
+        entries, lengths = self.entries(positions, cuisines)
+        columns = self.indices[entries]
+        rows = np.repeat(positions, lengths)
+
+        cells = pd.DataFrame({'cuisines': pd.Categorical.from_codes(np.arange(len(self.cuisines)), self.cuisines)})
+        for name in CELL_COLUMNS:
+            cells[name] = np.bincount(columns, weights=self.values[name][rows], minlength=len(self.cuisines))
+        counters = [name for name in CELL_COLUMNS if name != 'rating_sum']
+        cells[counters] = cells[counters].round().astype('int64')
+        return cells[cells['count'] > 0].reset_index(drop=True)
+
+    def totals(self, positions, cuisines=None):
+        # Totais por restaurante (cada linha conta uma vez, mesmo com várias culinárias)
+        count = len(positions)
+        listed = np.unique(self.indices[self.entries(positions, cuisines)[0]])
+        return {
+            'culinarias': len(listed),
+            'restaurantes': count,
+            'restaurantes_unicos': int(self.values['restaurants'][positions].sum()),
+            'avaliacoes': int(self.values['votes'][positions].sum()),
+            'nota_media': rating_total(self.values['rating_sum'][positions].sum()) / count if count else np.nan,
+            'custo_medio': self.values['cost_sum'][positions].sum() / count if count else np.nan,
+        }
+
+    def explode(self, frame, positions, cuisines=None):
+        # Uma linha por (restaurante, culinária listada), para os rankings
+        entries, lengths = self.entries(positions, cuisines)
+        exploded = frame.iloc[np.repeat(np.arange(len(frame)), lengths)].reset_index(drop=True)
+        exploded['cuisines'] = pd.Categorical.from_codes(self.indices[entries], self.cuisines)
+        return exploded
+
+def build_incidence(df):
+    return CuisineIncidence(df)
+
+def load_incidence(file_path=DATA_PATH):
+    return load_derived(build_incidence, file_path)
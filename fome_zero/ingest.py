@@ -0,0 +1,128 @@
+import os
+import time
+
+import pandas as pd
+
+from fome_zero.cube import CUBE_DIMENSIONS, build_cube, load_cube
+from fome_zero.data import DATA_PATH, clean_data, load_and_clean_data, replace_dataset
+from fome_zero.snapshot import delta_log_path, optimize_dtypes
+
+#-------------------------------------------------------------------------------
+# Ingestão incremental (append/upsert por restaurant_id)
+#-------------------------------------------------------------------------------
+
+# Colunas aditivas das células do cubo
+CUBE_PARTIALS = ['count', 'restaurants', 'votes', 'rating_sum', 'cost_sum', 'online_delivery']
+
+# Dimensões de texto do cubo (a faixa de nota já é inteira)
+CUBE_LABELS = ['country_name', 'city', 'cuisines']
+
+def split_upsert(df, delta):
+    # O delta substitui todas as linhas dos ids que traz; dentro do próprio
+    # delta vale a última linha de cada id
+    delta = delta.drop_duplicates('restaurant_id', keep='last').reset_index(drop=True)
+    replaced = df['restaurant_id'].isin(delta['restaurant_id']).to_numpy()
+    return df[~replaced], df[replaced], delta
+
+def merge_frames(kept, delta):
+    # Categorias diferentes viram texto no concat; optimize_dtypes refaz as
+    # categorias em ordem alfabética, como na carga completa
+    merged = pd.concat([kept, delta], ignore_index=True)
+    for column in merged.columns.intersection(kept.columns):
+        if isinstance(kept[column].dtype, pd.CategoricalDtype):
+            merged[column] = merged[column].astype(object)
+    return optimize_dtypes(merged)
+
+def cube_partials(cells, sign=1):
+    cells = cells.astype({column: object for column in CUBE_LABELS})
+    cells[CUBE_PARTIALS] = cells[CUBE_PARTIALS] * sign
+    return cells
+
+def update_cube(cube, removed, added):
+    # Subtrai as contribuições das linhas substituídas e soma as das novas.
+    # 'restaurants' continua certo: um id substituído sai inteiro do dataset,
+    # e os ids do delta não existem mais no que sobrou.
+    parts = [cube_partials(cube)]
+    if len(removed):
+        parts.append(cube_partials(build_cube(removed), -1))
+    if len(added):
+        parts.append(cube_partials(build_cube(added)))
+    return combine_cells(parts, cube)
+
+def combine_cells(parts, like):
+    # Soma parciais de várias origens célula a célula, com os tipos do cubo like
+    cells = pd.concat(parts, ignore_index=True).groupby(CUBE_DIMENSIONS, sort=True)[CUBE_PARTIALS].sum()
+    cells = cells[cells['count'] > 0].reset_index()
+
+    # Notas têm uma casa decimal: arredondar tira o resíduo de somas e subtrações
+    cells['rating_sum'] = cells['rating_sum'].round(1)
+    cells = cells.astype({column: 'category' for column in CUBE_LABELS})
+    return cells.astype({column: like[column].dtype for column in CUBE_PARTIALS + ['rating_bucket']})
+
+#-------------------------------------------------------------------------------
+# Log de deltas: o CSV base não muda, e o snapshot é só um cache dele. Cada
+# delta aplicado vai para o log ao lado do CSV, e toda reconstrução a partir do
+# CSV (data._load, snapshot, store.ingest_csv) reaplica o log inteiro.
+#-------------------------------------------------------------------------------
+
+def append_delta_log(raw, file_path=DATA_PATH):
+    # Linhas cruas do delta, nas colunas do log já existente
+    log_path = delta_log_path(file_path)
+    if os.path.exists(log_path):
+        raw = raw.reindex(columns=pd.read_csv(log_path, nrows=0).columns)
+        raw.to_csv(log_path, mode='a', header=False, index=False)
+    else:
+        raw.to_csv(log_path, index=False)
+
+def read_delta_log(file_path=DATA_PATH):
+    # Todos os deltas como um só: o último registro de cada id vence, como
+    # se fossem aplicados um a um
+    log_path = delta_log_path(file_path)
+    if not os.path.exists(log_path):
+        return None
+    return clean_data(pd.read_csv(log_path))
+
+def replay_deltas(df, file_path=DATA_PATH):
+    delta = read_delta_log(file_path)
+    if delta is None:
+        return df
+    kept, _, added = split_upsert(df, delta)
+    return merge_frames(kept, added)
+
+def apply_delta(delta_path, file_path=DATA_PATH):
+    df = load_and_clean_data(file_path)
+    cube = load_cube(file_path)
+    raw = pd.read_csv(delta_path)
+    delta = clean_data(raw)
+
+    # Registrado antes do snapshot: se a troca falhar, a próxima carga a
+    # partir do CSV ainda reaplica este delta
+    append_delta_log(raw, file_path)
+
+    kept, removed, added = split_upsert(df, delta)
+    merged = merge_frames(kept, added)
+    new_cube = update_cube(cube, removed, added)
+    version = replace_dataset(merged, {build_cube: new_cube}, file_path)
+
+    return {
+        'version': version,
+        'linhas_delta': len(added),
+        'inseridos': int((~added['restaurant_id'].isin(removed['restaurant_id'])).sum()),
+        'atualizados': int(removed['restaurant_id'].nunique()),
+        'linhas_removidas': len(removed),
+        'linhas_total': len(merged),
+        'celulas_cubo': len(new_cube),
+    }
+
+#-------------------------------------------------------------------------------
+# python -m fome_zero.ingest <delta.csv> [caminho do csv base]
+#-------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import sys
+
+    start = time.perf_counter()
+    summary = apply_delta(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else DATA_PATH)
+    for name, value in summary.items():
+        print(f"{name:<18}{value}")
+    print(f"{'tempo (s)':<18}{time.perf_counter() - start:.3f}")
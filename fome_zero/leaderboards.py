@@ -0,0 +1,44 @@
+from fome_zero.profiling import profiled
+
+#-------------------------------------------------------------------------------
+# Rankings por grupo (culinária, cidade, país)
+#-------------------------------------------------------------------------------
+
+# Agrupamentos disponíveis para os rankings
+LEADERBOARD_GROUPS = {
+    'cuisines': 'Culinária',
+    'city': 'Cidade',
+    'country_name': 'País',
+}
+
+# As médias saem arredondadas bem abaixo do passo da nota: 4.8 e 4.6 dão
+# 4.699999..., que sem isso perderia o empate com um 4.7 exato
+MEAN_DECIMALS = 9
+
+def group_means(df, group, item='restaurant_name', value='aggregate_rating'):
+    # Uma linha por (grupo, item), ordenada por grupo e depois por nome
+    return df.groupby([group, item], observed=True)[value].mean().round(MEAN_DECIMALS).reset_index()
+
+def extremes(table, group, value='aggregate_rating', k=1, largest=True, keep_ties=False):
+    # k=1 sem empates: idxmax/idxmin devolvem a primeira ocorrência, ou seja,
+    # o primeiro nome em ordem alfabética dentro do grupo
+    if k == 1 and not keep_ties:
+        grouped = table.groupby(group, observed=True)[value]
+        positions = grouped.idxmax() if largest else grouped.idxmin()
+        return table.loc[positions.to_numpy()].reset_index(drop=True)
+
+    # k>1 ou com empates: rank por grupo e só a parte selecionada é ordenada.
+    # 'min' mantém todos os empatados na posição k, 'first' corta pela ordem
+    ranks = table.groupby(group, observed=True)[value].rank(
+        method='min' if keep_ties else 'first', ascending=not largest
+    )
+    selected = table[ranks <= k].assign(posicao=ranks[ranks <= k].astype('int64'))
+    return selected.sort_values([group, 'posicao'], kind='stable').reset_index(drop=True)
+
+@profiled()
+def top_and_bottom(df, group, k=1, keep_ties=False, item='restaurant_name', value='aggregate_rating'):
+    # As médias são calculadas uma vez e servem para os dois extremos
+    table = group_means(df, group, item, value)
+    top = extremes(table, group, value, k=k, largest=True, keep_ties=keep_ties)
+    bottom = extremes(table, group, value, k=k, largest=False, keep_ties=keep_ties)
+    return top, bottom
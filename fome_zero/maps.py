@@ -0,0 +1,131 @@
+import os
+
+import folium
+import numpy as np
+from folium.plugins import FastMarkerCluster, HeatMap, MarkerCluster
+
+from fome_zero.profiling import profiled
+
+#-------------------------------------------------------------------------------
+# Mapas dos restaurantes
+#-------------------------------------------------------------------------------
+
+MAP_MODES = {
+    'viewport': "Área visível (índice espacial)",
+    'density': "Densidade (grade no servidor)",
+    'fast': "Rápido (agrupamento no navegador)",
+    'markers': "Clássico (um marcador por restaurante)",
+}
+
+# Modo inicial do mapa: só a área visível vai ao navegador, então o HTML não
+# cresce com a seleção
+DEFAULT_MAP_MODE = 'viewport'
+
+# Modos que mandam todas as linhas da seleção ao navegador (o HTML do modo
+# rápido passa de 5 MB com 75 mil restaurantes). Acima deste limite a página
+# usa o modo padrão.
+CLIENT_MAP_MODES = ('fast', 'markers')
+CLIENT_MAP_MAX_ROWS = int(os.environ.get('FOME_ZERO_CLIENT_MAP_ROWS') or 10_000)
+
+# Colunas enviadas ao navegador no modo rápido, na ordem usada pelo callback
+FAST_MAP_COLUMNS = ['latitude', 'longitude', 'restaurant_name', 'city', 'country_name', 'aggregate_rating']
+
+# Um único callback JavaScript cria cada marcador a partir de uma linha de
+# dados. O popup é uma função, então o HTML só é montado quando é aberto.
+FAST_MAP_CALLBACK = """
+function (row) {
+    var escape = function (text) {
+        return String(text).replace(/[&<>"']/g, function (c) {
+            return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+        });
+    };
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindTooltip(escape(row[2]));
+    marker.bindPopup(function () {
+        return '<b>' + escape(row[2]) + '</b><br>' + escape(row[3]) + ' - ' + escape(row[4]) + '<br>Avaliação: ' + row[5];
+    });
+    return marker;
+}
+"""
+
+def create_map(dataframe):
+    m = folium.Map(location=[0, 0], zoom_start=2)
+    marker_cluster = MarkerCluster().add_to(m)
+
+    for index, row in dataframe.iterrows():
+        folium.Marker(location=[row['latitude'], row['longitude']],
+                      popup=f"<b>{row['restaurant_name']}</b><br>\n{row['city']} - {row['country_name']}<br>\nAvaliação: {row['aggregate_rating']}\n", 
+                      tooltip=row['restaurant_name']).add_to(marker_cluster)
+    return m
+
+def fast_map_data(dataframe):
+    # Monta as linhas a partir dos arrays das colunas, sem objetos por marcador
+    latitude = np.round(dataframe['latitude'].to_numpy(dtype='float64'), 5)
+    longitude = np.round(dataframe['longitude'].to_numpy(dtype='float64'), 5)
+    return list(zip(
+        latitude.tolist(),
+        longitude.tolist(),
+        dataframe['restaurant_name'].astype(str).tolist(),
+        dataframe['city'].astype(str).tolist(),
+        dataframe['country_name'].astype(str).tolist(),
+        dataframe['aggregate_rating'].tolist(),
+    ))
+
+def create_fast_map(dataframe):
+    m = folium.Map(location=[0, 0], zoom_start=2)
+    FastMarkerCluster(fast_map_data(dataframe), callback=FAST_MAP_CALLBACK, chunkedLoading=True).add_to(m)
+    return m
+
+def create_base_map():
+    return folium.Map(location=[0, 0], zoom_start=2)
+
+def cluster_icon(count):
+    size = 30 if count < 100 else 40 if count < 1000 else 50
+    return folium.DivIcon(
+        html=f'<div style="width:{size}px;height:{size}px;line-height:{size}px;border-radius:50%;'
+             f'background:rgba(241,128,23,0.75);color:#fff;text-align:center;font-weight:bold;">{count}</div>',
+        icon_size=(size, size),
+        icon_anchor=(size // 2, size // 2),
+    )
+
+@profiled()
+def create_viewport_layer(rows, clusters):
+    # Camada com os marcadores individuais da área visível e um contador por
+    # célula densa, agregada no servidor
+    layer = folium.FeatureGroup(name='restaurantes')
+
+    for name, city, country, rating, latitude, longitude in zip(
+        rows['restaurant_name'], rows['city'], rows['country_name'], rows['aggregate_rating'], rows['latitude'], rows['longitude']
+    ):
+        folium.Marker(location=[latitude, longitude],
+                      popup=f"<b>{name}</b><br>\n{city} - {country}<br>\nAvaliação: {rating}\n",
+                      tooltip=name).add_to(layer)
+
+    for latitude, longitude, count in zip(clusters['latitude'], clusters['longitude'], clusters['count']):
+        folium.Marker(location=[latitude, longitude], icon=cluster_icon(int(count)),
+                      tooltip=f"{count} restaurantes").add_to(layer)
+    return layer
+
+@profiled()
+def create_density_layer(cells):
+    # Uma única camada de calor com uma entrada por célula da grade, com a
+    # intensidade relativa à célula mais pesada da área visível
+    layer = folium.FeatureGroup(name='densidade')
+    if len(cells['value']):
+        intensity = cells['value'] / cells['value'].max()
+        data = np.column_stack([np.round(cells['latitude'], 4), np.round(cells['longitude'], 4), np.round(intensity, 3)])
+        HeatMap(data.tolist(), radius=12, blur=10, min_opacity=0.3).add_to(layer)
+    return layer
+
+def bounded_map_mode(mode, rows):
+    # Modo que a página usa para uma seleção com rows restaurantes
+    if mode in CLIENT_MAP_MODES and rows > CLIENT_MAP_MAX_ROWS:
+        return DEFAULT_MAP_MODE
+    return mode
+
+@profiled()
+def build_map(dataframe, mode):
+    # Mapas montados inteiros no servidor (modos de CLIENT_MAP_MODES)
+    if mode == 'markers':
+        return create_map(dataframe)
+    return create_fast_map(dataframe)
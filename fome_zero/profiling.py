@@ -0,0 +1,211 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+from fome_zero.caching import cache_stats
+
+#-------------------------------------------------------------------------------
+# Perfil de execução por etapa (opcional)
+#-------------------------------------------------------------------------------
+
+# Liga com FOME_ZERO_PROFILE=1 ou ?profile=1 na URL
+PROFILE_ENV = 'FOME_ZERO_PROFILE'
+PROFILE_PARAM = 'profile'
+
+# Arquivo JSON-lines com uma linha por etapa medida
+PROFILE_LOG = os.environ.get('FOME_ZERO_PROFILE_LOG', 'fome_zero_profile.jsonl')
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+# Cada sessão roda a página na sua própria thread: o perfil ativo da
+# execução atual fica guardado por thread
+_active = threading.local()
+_log_lock = threading.Lock()
+
+# O tracemalloc vale para o processo inteiro e deixa todas as sessões mais
+# lentas: fica ligado só enquanto alguma execução com perfil está aberta, e
+# só é desligado aqui se foi ligado aqui
+_tracing_lock = threading.Lock()
+_tracing_runs = 0
+_tracing_changes = 0
+_tracing_started = False
+
+def acquire_tracing():
+    global _tracing_runs, _tracing_changes, _tracing_started
+    with _tracing_lock:
+        if _tracing_runs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_runs += 1
+        _tracing_changes += 1
+
+def release_tracing():
+    global _tracing_runs, _tracing_changes, _tracing_started
+    with _tracing_lock:
+        _tracing_runs -= 1
+        _tracing_changes += 1
+        if _tracing_runs == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+def tracing_state():
+    # (execuções com perfil abertas, aberturas e fechamentos até agora). O
+    # pico e a memória do tracemalloc são do processo inteiro: só valem para
+    # uma etapa se o estado era (1, n) no início e continua igual no fim.
+    with _tracing_lock:
+        return _tracing_runs, _tracing_changes
+
+class Profiler:
+
+    def __init__(self, page):
+        self.page = page
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.perf_counter()
+        self.stages = []
+
+        # Pico de memória de cada etapa aberta, incluindo as etapas internas
+        # (o tracemalloc só guarda um pico por vez)
+        self.peaks = []
+
+def count_rows(value):
+    # Linhas de DataFrames, Series, arrays e seleções; tuplas somam as partes
+    if isinstance(value, tuple):
+        counts = [count_rows(item) for item in value]
+        return sum(counts) if counts and None not in counts else None
+    if hasattr(value, 'shape') or hasattr(value, 'positions'):
+        return len(value)
+    return None
+
+def profiling_enabled():
+    if os.environ.get(PROFILE_ENV, '').lower() in TRUE_VALUES:
+        return True
+    import streamlit as st
+    return st.query_params.get(PROFILE_PARAM, '').lower() in TRUE_VALUES
+
+def start_profiling(page):
+    # Sem perfil ligado, nada é medido e as etapas viram no-ops. Uma execução
+    # anterior interrompida (exceção, rerun) nesta thread não chegou ao
+    # finish_profiling e devolve o tracemalloc aqui.
+    if getattr(_active, 'profiler', None) is not None:
+        release_tracing()
+    _active.profiler = None
+    if not profiling_enabled():
+        return None
+    acquire_tracing()
+    _active.profiler = Profiler(page)
+    return _active.profiler
+
+@contextmanager
+def stage(name, rows_in=None):
+    profiler = getattr(_active, 'profiler', None)
+    record = {'stage': name, 'rows_in': rows_in, 'rows_out': None}
+    if profiler is None:
+        yield record
+        return
+
+    record['depth'] = len(profiler.peaks)
+    profiler.stages.append(record)
+
+    # Com outra sessão também medindo, a memória dela entraria na conta (e o
+    # reset_peak apagaria o pico dela): a etapa fica só com o tempo
+    state = tracing_state()
+    exclusive = state[0] == 1
+    if exclusive:
+        if profiler.peaks:
+            profiler.peaks[-1] = max(profiler.peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+    profiler.peaks.append(0)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['seconds'] = time.perf_counter() - start
+        inner_peak = profiler.peaks.pop()
+        if exclusive and tracing_state() == state:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, inner_peak)
+            if profiler.peaks:
+                profiler.peaks[-1] = max(profiler.peaks[-1], peak)
+            record['memory_delta'] = current - memory_before
+            record['memory_peak'] = peak - memory_before
+        else:
+            record['memory_delta'] = record['memory_peak'] = None
+
+def profiled(name=None):
+    # Decorador: mede a função como uma etapa, com as linhas do primeiro
+    # argumento como entrada e as do resultado como saída
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_active, 'profiler', None) is None:
+                return func(*args, **kwargs)
+            with stage(name or func.__name__, count_rows(args[0]) if args else None) as record:
+                result = func(*args, **kwargs)
+                record['rows_out'] = count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+def write_log(profiler, file_path=PROFILE_LOG):
+    lines = [
+        json.dumps({'run': profiler.run_id, 'page': profiler.page, 'timestamp': time.time(), **record})
+        for record in profiler.stages
+    ]
+    with _log_lock, open(file_path, 'a', encoding='utf-8') as f:
+        f.write(''.join(line + '\n' for line in lines))
+
+def kilobytes(value):
+    return None if value is None else round(value / 1024, 1)
+
+def finish_profiling():
+    # Mostra o painel no sidebar e grava as etapas no log
+    profiler = getattr(_active, 'profiler', None)
+    _active.profiler = None
+    if profiler is None:
+        return None
+    release_tracing()
+
+    import pandas as pd
+    import streamlit as st
+
+    total = time.perf_counter() - profiler.started
+    try:
+        write_log(profiler)
+    except OSError:
+        pass
+
+    tabela = pd.DataFrame([{
+        'Etapa': '↳ ' * record['depth'] + record['stage'],
+        'Tempo (ms)': round(record['seconds'] * 1000, 1),
+        'Linhas entrada': record['rows_in'],
+        'Linhas saída': record['rows_out'],
+        'Memória Δ (KB)': kilobytes(record['memory_delta']),
+        'Pico (KB)': kilobytes(record['memory_peak']),
+    } for record in profiler.stages])
+
+    # Caches do processo: acumulados desde o início do servidor, entre sessões
+    caches = pd.DataFrame([{
+        'Cache': name,
+        'Entradas': stats['entries'],
+        'Acertos': stats['hits'],
+        'Faltas': stats['misses'],
+        'Taxa de acerto (%)': round(stats['hit_rate'] * 100, 1),
+        'Construção média (ms)': round(stats['mean_build_seconds'] * 1000, 1),
+        'Construção total (ms)': round(stats['build_seconds'] * 1000, 1),
+    } for name, stats in cache_stats().items()])
+
+    with st.sidebar.expander("⏱️ Perfil de execução", expanded=True):
+        st.caption(f"Execução {profiler.run_id}: {total * 1000:.0f} ms no total")
+        if any(record['memory_delta'] is None for record in profiler.stages):
+            st.caption("Memória em branco: outra sessão estava medindo ao mesmo tempo")
+        st.dataframe(tabela, hide_index=True, use_container_width=True)
+        if len(caches):
+            st.caption("Caches do processo")
+            st.dataframe(caches, hide_index=True, use_container_width=True)
+    return profiler
@@ -0,0 +1,212 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from fome_zero import cube
+from fome_zero.aggregations import assemble, base_metrics, dimension_columns
+from fome_zero.cube import rating_bounds, select_cells
+from fome_zero.leaderboards import MEAN_DECIMALS, top_and_bottom
+
+#-------------------------------------------------------------------------------
+# Backends de consulta: pandas em memória ou SQL embarcado (DuckDB)
+#-------------------------------------------------------------------------------
+
+# FOME_ZERO_BACKEND escolhe como as páginas respondem métricas e rankings
+BACKEND_ENV = 'FOME_ZERO_BACKEND'
+
+QUERY_BACKENDS = {
+    'pandas': "pandas (cubo e linhas em memória)",
+    'duckdb': "DuckDB (SQL sobre os arquivos Parquet)",
+}
+
+def query_backend():
+    backend = os.environ.get(BACKEND_ENV) or 'pandas'
+    if backend not in QUERY_BACKENDS:
+        raise ValueError(f"Backend de consulta desconhecido: {backend}")
+    return backend
+
+def open_query(source, rows=None, **filters):
+    # source é a fonte das páginas (store.load_source); rows devolve as linhas
+    # da seleção para os rankings, e só é chamado pelo backend pandas. Com
+    # FOME_ZERO_REPORTS, as visões pré-calculadas respondem antes do backend.
+    reports_dir = os.environ.get('FOME_ZERO_REPORTS')
+    if reports_dir:
+        from fome_zero.report import report_query
+
+        query = report_query(reports_dir, source, rows, **filters)
+        if query is not None:
+            return query
+    return live_query(source, rows, **filters)
+
+def live_query(source, rows=None, **filters):
+    if query_backend() == 'duckdb':
+        return SQLQuery(source.sql_table(filters.get('countries')), filters)
+    return PandasQuery(select_cells(source.cube, **filters), rows)
+
+class PandasQuery:
+    # Agregados pelas células do cubo (ou da matriz de incidência) e rankings
+    # pelas linhas da seleção
+
+    def __init__(self, cells, rows=None, cuisine_rows=None, totals=None):
+        self.cells = cells
+        self._rows = {'rows': rows, 'cuisine_rows': cuisine_rows}
+        self._totals = totals
+
+    def totals(self):
+        if self._totals is None:
+            self._totals = cube.totals(self.cells)
+        return self._totals
+
+    def summarize(self, dimension, metrics):
+        return cube.summarize(self.cells, dimension, metrics)
+
+    def counts_by(self, column):
+        return cube.counts_by(self.cells, column)
+
+    def rows(self, group=None):
+        # Com todas as culinárias listadas, os rankings por culinária usam as
+        # linhas explodidas (uma por restaurante e culinária). Linhas passadas
+        # como função só são montadas na primeira vez em que são pedidas.
+        name = 'cuisine_rows' if group == 'cuisines' and self._rows['cuisine_rows'] is not None else 'rows'
+        if callable(self._rows[name]):
+            self._rows[name] = self._rows[name]()
+        return self._rows[name]
+
+    def top_and_bottom(self, group, k=1, keep_ties=False):
+        return top_and_bottom(self.rows(group), group, k=k, keep_ties=keep_ties)
+
+#-------------------------------------------------------------------------------
+# SQL: filtros e métricas compilados e empurrados para o leitor de Parquet
+#-------------------------------------------------------------------------------
+
+# A nota vai como float32 no snapshot e volta arredondada, como em
+# snapshot.read_snapshot
+RATING_SQL = "ROUND(CAST(aggregate_rating AS DOUBLE), 1)"
+
+# Somas e médias em inteiros (décimos de nota, custo) e uma única divisão no
+# fim, como cube.summarize: sem o ruído de AVG, os empates ficam iguais
+RATING_TENTHS_SQL = "CAST(SUM(ROUND(CAST(aggregate_rating AS DOUBLE) * 10)) AS BIGINT)"
+COST_SQL = "CAST(SUM(average_cost_for_two) AS BIGINT)"
+ONLINE_SQL = "CAST(is_delivering_now = 1 AND has_online_delivery = 1 AS BIGINT)"
+
+# Os mesmos nomes de aggregations.METRICS e cube.CUBE_METRICS, como expressões SQL
+SQL_METRICS = {
+    'paises': "COUNT(DISTINCT country_name)",
+    'cidades': "COUNT(DISTINCT city)",
+    'culinarias': "COUNT(DISTINCT cuisines)",
+    'restaurantes': "COUNT(*)",
+    'restaurantes_unicos': "COUNT(DISTINCT restaurant_id)",
+    'avaliacoes': "CAST(SUM(votes) AS BIGINT)",
+    'nota_soma': f"{RATING_TENTHS_SQL} / 10",
+    'nota_media': f"{RATING_TENTHS_SQL} / 10 / COUNT(*)",
+    'custo_medio': f"{COST_SQL} / COUNT(*)",
+    'online_entregas': f"CAST(SUM({ONLINE_SQL}) AS BIGINT)",
+}
+
+# Chaves de cube.totals, na mesma ordem
+TOTAL_METRICS = ['paises', 'cidades', 'culinarias', 'restaurantes', 'restaurantes_unicos', 'avaliacoes', 'nota_media', 'custo_medio']
+
+def sql_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+def compile_filters(countries=None, rating_range=None, cities=None, cuisines=None):
+    # Mesma semântica de cube.select_cells: listas de valores e a nota pela
+    # faixa de 0.1 ponto. Só comparações simples com constantes, para que o
+    # DuckDB use as estatísticas dos row groups.
+    conditions, params = [], []
+    for column, values in (('country_name', countries), ('city', cities), ('cuisines', cuisines)):
+        if values is None:
+            continue
+        values = list(values)
+        if not values:
+            conditions.append("FALSE")
+            continue
+        conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(str(value) for value in values)
+    if rating_range is not None:
+        conditions.append("aggregate_rating >= ? AND aggregate_rating < ?")
+        params.extend(rating_bounds(rating_range))
+    return ' AND '.join(conditions) or 'TRUE', params
+
+_connection = None
+_connection_lock = threading.Lock()
+
+def connect():
+    # Uma conexão por processo; cada consulta usa o próprio cursor, o que
+    # permite sessões concorrentes
+    global _connection
+    import duckdb
+
+    with _connection_lock:
+        if _connection is None:
+            _connection = duckdb.connect()
+    return _connection.cursor()
+
+class SQLQuery:
+
+    def __init__(self, table, filters):
+        # table: expressão SQL da tabela, ou um DataFrame quando não há
+        # snapshot atualizado no disco
+        self.table = table
+        self.where, self.params = compile_filters(**filters)
+        self._totals = None
+
+    def execute(self, sql, params=()):
+        with connect() as cursor:
+            table = self.table
+            if not isinstance(table, str):
+                cursor.register('restaurantes', table)
+                table = 'restaurantes'
+            return cursor.execute(sql.format(table=table, where=self.where), [*self.params, *params]).df()
+
+    def totals(self):
+        if self._totals is None:
+            columns = ', '.join(f"{SQL_METRICS[name]} AS {name}" for name in TOTAL_METRICS)
+            row = self.execute(f"SELECT {columns} FROM {{table}} WHERE {{where}}").iloc[0]
+
+            # Sem linhas, as somas do SQL vêm nulas; as médias ficam NaN como no cubo
+            self._totals = {}
+            for name in TOTAL_METRICS:
+                if name in ('nota_media', 'custo_medio'):
+                    self._totals[name] = float(row[name]) if pd.notna(row[name]) else np.nan
+                else:
+                    self._totals[name] = int(row[name]) if pd.notna(row[name]) else 0
+        return self._totals
+
+    def summarize(self, dimension, metrics):
+        keys = ', '.join(dimension_columns(dimension))
+        columns = ', '.join(f"{SQL_METRICS[name]} AS {name}" for name in base_metrics(metrics))
+        grouped = self.execute(f"SELECT {keys}, {columns} FROM {{table}} WHERE {{where}} GROUP BY {keys} ORDER BY {keys}")
+        return assemble(grouped.set_index(dimension_columns(dimension)), metrics)
+
+    def counts_by(self, column):
+        # Mesma ordenação final de cube.counts_by, a partir da mesma ordem de grupos
+        counts = self.execute(f"SELECT {column}, COUNT(*) AS count FROM {{table}} WHERE {{where}} GROUP BY {column} ORDER BY {column}")
+        return counts.set_index(column)['count'].sort_values(ascending=False)
+
+    def top_and_bottom(self, group, k=1, keep_ties=False):
+        # Médias por (grupo, restaurante), arredondadas como em
+        # leaderboards.group_means, e a posição em cada grupo por função de
+        # janela. Empates saem pelo nome, como no idxmax/rank do pandas.
+        rank = 'RANK() OVER (PARTITION BY {group} ORDER BY aggregate_rating {order})' if keep_ties else \
+               'ROW_NUMBER() OVER (PARTITION BY {group} ORDER BY aggregate_rating {order}, restaurant_name)'
+        results = []
+        for order in ('DESC', 'ASC'):
+            ranking = self.execute(f"""
+                WITH medias AS (
+                    SELECT {group}, restaurant_name, ROUND(AVG({RATING_SQL}), {MEAN_DECIMALS}) AS aggregate_rating
+                    FROM {{table}} WHERE {{where}}
+                    GROUP BY {group}, restaurant_name
+                )
+                SELECT * FROM (
+                    SELECT *, {rank.format(group=group, order=order)} AS posicao
+                    FROM medias
+                )
+                WHERE posicao <= ?
+                ORDER BY {group}, posicao, restaurant_name
+            """, [int(k)])
+            ranking['posicao'] = ranking['posicao'].astype('int64')
+            results.append(ranking.drop(columns='posicao') if k == 1 and not keep_ties else ranking)
+        return tuple(results)
@@ -0,0 +1,410 @@
+import base64
+import io
+import json
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from fome_zero import dashboard
+from fome_zero.caching import LRUCache, filter_key
+from fome_zero.density import DENSITY_ZOOMS, build_density
+from fome_zero.leaderboards import LEADERBOARD_GROUPS
+from fome_zero.maps import create_base_map, create_density_layer
+from fome_zero.query import live_query
+from fome_zero.spatial import build_grid_index
+from fome_zero.store import load_source
+
+#-------------------------------------------------------------------------------
+# Relatórios pré-calculados: as saídas das páginas gravadas em disco
+#-------------------------------------------------------------------------------
+
+# FOME_ZERO_REPORTS aponta para a pasta gerada por este módulo; com ela, as
+# páginas respondem as visões prontas do disco em vez de consultar os dados
+REPORTS_ENV = 'FOME_ZERO_REPORTS'
+REPORTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dataset', 'reports')
+
+INDEX_FILE = 'index.json'
+REPORT_FILE = 'report.json'
+ANSWERS_FILE = 'consultas.json'
+HTML_FILE = 'report.html'
+MAP_FILE = 'mapa.html'
+
+# Faixa completa do slider e as faixas de nota de --faixas
+FULL_RANGE = (0.0, 5.0)
+RATING_BANDS = ((0.0, 2.9), (3.0, 3.9), (4.0, 5.0))
+
+#-------------------------------------------------------------------------------
+# Visões: global, por país e (opcional) por país e faixa de nota
+#-------------------------------------------------------------------------------
+
+def view_filters(source, countries=None, rating_range=None, cities=None, cuisines=None):
+    # Forma canônica dos filtros de uma visão, ou None quando as páginas
+    # pediram algo que os relatórios não cobrem (parte das cidades ou das
+    # culinárias)
+    for column, values in (('city', cities), ('cuisines', cuisines)):
+        if values is not None and not set(source.options(column)) <= set(values):
+            return None
+    countries = source.options('country_name') if countries is None else countries
+    rating_range = FULL_RANGE if rating_range is None else rating_range
+    return {
+        'countries': sorted(map(str, countries)),
+        'rating_range': tuple(round(float(value), 1) for value in rating_range),
+    }
+
+def report_key(countries, rating_range):
+    # Mesma chave para os mesmos filtros, em qualquer ordem de países
+    return filter_key(countries=list(countries), rating_range=tuple(rating_range))
+
+def slugify(name):
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+def report_views(source, bands=False):
+    # [(pasta, filtros)] de todas as visões geradas
+    ranges = [FULL_RANGE] + (list(RATING_BANDS) if bands else [])
+    groups = [('global', source.options('country_name'))] + [(slugify(country), [country]) for country in source.options('country_name')]
+    views = []
+    for slug, countries in groups:
+        for rating_range in ranges:
+            suffix = '' if rating_range == FULL_RANGE else f'_{rating_range[0]:.1f}-{rating_range[1]:.1f}'
+            views.append((slug + suffix, view_filters(source, countries, rating_range)))
+    return views
+
+#-------------------------------------------------------------------------------
+# Respostas das consultas: gravadas na geração, servidas às páginas
+#-------------------------------------------------------------------------------
+
+def call_key(method, *args):
+    # A ordem das métricas faz parte da chamada: é a ordem das colunas
+    return json.dumps([method, *args], default=str)
+
+def plain(value):
+    # Valores do numpy como tipos do Python; NaN vira null
+    if isinstance(value, dict):
+        return {str(key): plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+def plain_categories(df):
+    # Categorias viram texto: o esquema de uma coluna categórica listaria
+    # todas as categorias do dataset em cada tabela
+    return df.astype({column: object for column in df.select_dtypes('category')})
+
+def table_json(df):
+    # Tabelas legíveis do report.json; as respostas usam table_bytes
+    return json.loads(plain_categories(df).to_json(orient='table', double_precision=15, date_format='iso'))
+
+def table_bytes(df):
+    # Parquet em base64: os floats voltam bit a bit iguais aos da consulta ao
+    # vivo (o JSON do pandas arredonda em 15 dígitos e muda desempates)
+    buffer = io.BytesIO()
+    plain_categories(df).to_parquet(buffer, engine='pyarrow')
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+def read_table(payload):
+    return pd.read_parquet(io.BytesIO(base64.b64decode(payload)), engine='pyarrow')
+
+def encode_result(result):
+    if isinstance(result, pd.DataFrame):
+        return {'tipo': 'tabela', 'valor': table_bytes(result)}
+    if isinstance(result, pd.Series):
+        return {'tipo': 'serie', 'valor': table_bytes(result.to_frame())}
+    if isinstance(result, tuple):
+        return {'tipo': 'tupla', 'valor': [encode_result(item) for item in result]}
+    return {'tipo': 'valores', 'valor': plain(result)}
+
+def decode_result(payload):
+    kind, value = payload['tipo'], payload['valor']
+    if kind == 'tabela':
+        return read_table(value)
+    if kind == 'serie':
+        return read_table(value).iloc[:, 0]
+    if kind == 'tupla':
+        return tuple(decode_result(item) for item in value)
+    return {key: np.nan if item is None else item for key, item in value.items()}
+
+def copied(result):
+    # As páginas recebem cópias: a mesma resposta atende várias sessões
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return result.copy()
+    if isinstance(result, tuple):
+        return tuple(copied(item) for item in result)
+    return dict(result)
+
+class RecordingQuery:
+    # Repassa as chamadas à consulta real e guarda cada resposta
+
+    def __init__(self, query):
+        self.query = query
+        self.answers = {}
+
+    def record(self, key, answer):
+        self.answers[key] = answer
+        return answer
+
+    def totals(self):
+        return self.record(call_key('totals'), self.query.totals())
+
+    def summarize(self, dimension, metrics):
+        return self.record(call_key('summarize', dimension, metrics), self.query.summarize(dimension, metrics))
+
+    def counts_by(self, column):
+        return self.record(call_key('counts_by', column), self.query.counts_by(column))
+
+    def rows(self, group=None):
+        return self.query.rows(group)
+
+    def top_and_bottom(self, group, k=1, keep_ties=False):
+        key = call_key('top_and_bottom', group, int(k), bool(keep_ties))
+        return self.record(key, self.query.top_and_bottom(group, k=k, keep_ties=keep_ties))
+
+class ReportQuery:
+    # Mesma interface dos backends de consulta. Chamadas gravadas no relatório
+    # voltam do disco; as outras (outro tamanho de ranking, linhas) vão para
+    # a consulta real, montada só quando alguma delas acontece.
+
+    def __init__(self, answers, live):
+        self.answers = answers
+        self._live = live
+
+    @property
+    def live(self):
+        if callable(self._live):
+            self._live = self._live()
+        return self._live
+
+    def answer(self, key, compute):
+        if key in self.answers:
+            return copied(self.answers[key])
+        return compute()
+
+    def totals(self):
+        return self.answer(call_key('totals'), lambda: self.live.totals())
+
+    def summarize(self, dimension, metrics):
+        return self.answer(call_key('summarize', dimension, metrics), lambda: self.live.summarize(dimension, metrics))
+
+    def counts_by(self, column):
+        return self.answer(call_key('counts_by', column), lambda: self.live.counts_by(column))
+
+    def rows(self, group=None):
+        return self.live.rows(group)
+
+    def top_and_bottom(self, group, k=1, keep_ties=False):
+        key = call_key('top_and_bottom', group, int(k), bool(keep_ties))
+        return self.answer(key, lambda: self.live.top_and_bottom(group, k=k, keep_ties=keep_ties))
+
+#-------------------------------------------------------------------------------
+# Geração de uma visão (roda nos processos do pool)
+#-------------------------------------------------------------------------------
+
+# Colunas das linhas lidas para os rankings e o mapa de cada visão
+REPORT_COLUMNS = dashboard.RANKING_COLUMNS + ['latitude', 'longitude']
+
+def figure_zoom(latitude, longitude):
+    # Nível da densidade que cabe na extensão dos restaurantes da visão
+    span = max(np.ptp(latitude), np.ptp(longitude), 1e-3)
+    return int(np.clip(np.floor(np.log2(360 / span)), min(DENSITY_ZOOMS), max(DENSITY_ZOOMS)))
+
+def save_density_map(source, selection, path):
+    index = source.derived(selection, build_grid_index)
+    selected = selection.mask()
+    latitude, longitude = index.latitude[selected], index.longitude[selected]
+    m = create_base_map()
+    if len(latitude):
+        levels = build_density(index, selected, selection.df)
+        create_density_layer(levels.cells(figure_zoom(latitude, longitude))).add_to(m)
+        m.fit_bounds([[latitude.min(), longitude.min()], [latitude.max(), longitude.max()]])
+    m.save(path)
+
+def page_sections(query):
+    # Métricas, tabelas e gráficos de cada página, pelas mesmas funções (dashboard)
+    totals = query.totals()
+
+    culinarias, paises = dashboard.preprocess_start_data(query)
+    resumo_paises = dashboard.preprocess_country_data(query)
+    resumo_cidades = dashboard.preprocess_city_data(query)
+    maior, menor, custo, nota, online = dashboard.preprocess_cuisine_data(query)
+    # Rankings iniciais da página de culinárias, em cada agrupamento
+    for group in LEADERBOARD_GROUPS:
+        query.top_and_bottom(group, k=dashboard.RANKING_SIZE)
+
+    return {
+        'inicio': {
+            'metricas': {name: totals[name] for name in ('restaurantes_unicos', 'paises', 'cidades', 'avaliacoes', 'culinarias')},
+            'tabelas': {'culinarias': culinarias, 'paises': paises},
+            'graficos': dashboard.create_start_charts(culinarias, paises),
+        },
+        'paises': {
+            'metricas': dashboard.calculate_country_metrics(query),
+            'tabelas': {'resumo': resumo_paises[dashboard.SUMMARY_COLUMNS]},
+            'graficos': dashboard.create_country_charts(resumo_paises),
+        },
+        'cidades': {
+            'metricas': dashboard.calculate_city_metrics(query),
+            'tabelas': {'resumo': resumo_cidades},
+            'graficos': dashboard.create_city_charts(resumo_cidades),
+        },
+        'culinarias': {
+            'metricas': dashboard.calculate_cuisine_metrics(totals),
+            'tabelas': {
+                'maiores_avaliacoes': maior,
+                'menores_avaliacoes': menor,
+                'resumo': dashboard.create_summary_table(custo, nota, online),
+            },
+            'graficos': [("Distribuição dos Tipos de Culinária", dashboard.create_distribution_chart(query))],
+        },
+    }
+
+def write_html(path, title, sections):
+    parts = [f'<html><head><meta charset="utf-8"><title>{title}</title></head><body>', f'<h1>{title}</h1>',
+             f'<p><a href="{MAP_FILE}">Mapa de densidade</a></p>']
+    plotlyjs = 'cdn'
+    for page, section in sections.items():
+        parts.append(f'<h2>{page}</h2><ul>')
+        parts.extend(f'<li>{name}: {value}</li>' for name, value in plain(section['metricas']).items())
+        parts.append('</ul>')
+        for name, table in section['tabelas'].items():
+            parts.append(f'<h3>{name}</h3>' + table.to_html(index=False, max_rows=50))
+        for title_section, fig in section['graficos']:
+            # O plotly.js entra uma vez, no primeiro gráfico
+            parts.append(f'<h3>{title_section}</h3>' + fig.to_html(full_html=False, include_plotlyjs=plotlyjs))
+            plotlyjs = False
+    parts.append('</body></html>')
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('\n'.join(parts))
+
+def build_view(slug, filters, out_dir):
+    start = time.perf_counter()
+    source = load_source()
+    view_dir = os.path.join(out_dir, slug)
+    os.makedirs(view_dir, exist_ok=True)
+
+    selection = source.select({}, 'relatorio', columns=REPORT_COLUMNS, **filters)
+    query = RecordingQuery(live_query(source, rows=lambda: selection.frame(dashboard.RANKING_COLUMNS), **filters))
+    sections = page_sections(query)
+
+    report = {
+        'filtros': plain(filters),
+        'paginas': {
+            page: {
+                'metricas': plain(section['metricas']),
+                'tabelas': {name: table_json(table) for name, table in section['tabelas'].items()},
+                'graficos': [{'titulo': title, 'figura': json.loads(fig.to_json())} for title, fig in section['graficos']],
+            }
+            for page, section in sections.items()
+        },
+    }
+    with open(os.path.join(view_dir, REPORT_FILE), 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False)
+    with open(os.path.join(view_dir, ANSWERS_FILE), 'w', encoding='utf-8') as file:
+        json.dump({key: encode_result(answer) for key, answer in query.answers.items()}, file, ensure_ascii=False)
+    write_html(os.path.join(view_dir, HTML_FILE), slug, sections)
+    save_density_map(source, selection, os.path.join(view_dir, MAP_FILE))
+
+    return {
+        'chave': report_key(**filters),
+        'filtros': plain(filters),
+        'restaurantes': plain(query.totals()['restaurantes']),
+        'segundos': round(time.perf_counter() - start, 3),
+    }
+
+#-------------------------------------------------------------------------------
+# Geração de todas as visões
+#-------------------------------------------------------------------------------
+
+def pool_context():
+    # Com fork, os processos herdam o dataset e os índices já carregados
+    import multiprocessing
+
+    return multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+
+def generate_reports(out_dir=None, workers=None, bands=False):
+    out_dir = out_dir or os.environ.get(REPORTS_ENV) or REPORTS_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    source = load_source()
+
+    views = report_views(source, bands)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as pool:
+        futures = {slug: pool.submit(build_view, slug, filters, out_dir) for slug, filters in views}
+        entries = {slug: future.result() for slug, future in futures.items()}
+
+    # O índice é trocado de uma vez: o dashboard nunca lê um índice pela metade
+    index = {
+        'versao': source.version,
+        'gerado_em': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'visoes': entries,
+    }
+    temporary = os.path.join(out_dir, INDEX_FILE + '.tmp')
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(index, file, ensure_ascii=False, indent=1)
+    os.replace(temporary, os.path.join(out_dir, INDEX_FILE))
+    return index
+
+#-------------------------------------------------------------------------------
+# Leitura pelas páginas
+#-------------------------------------------------------------------------------
+
+# Índices e respostas lidos do disco, pelo caminho e mtime do arquivo
+_reports = LRUCache(max_entries=32, name='relatórios')
+
+def load_json(path):
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    def build():
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    return _reports.get_or_build((path, mtime_ns, 'json'), build)
+
+def view_answers(path):
+    mtime_ns = os.stat(path).st_mtime_ns
+
+    def build():
+        with open(path, encoding='utf-8') as file:
+            return {key: decode_result(payload) for key, payload in json.load(file).items()}
+    return _reports.get_or_build((path, mtime_ns, 'respostas'), build)
+
+def report_query(reports_dir, source, rows=None, **filters):
+    # ReportQuery da visão pronta destes filtros, ou None para consultar ao vivo
+    filters_view = view_filters(source, **filters)
+    index = load_json(os.path.join(reports_dir, INDEX_FILE))
+    if filters_view is None or index is None or index['versao'] != source.version:
+        return None
+    key = report_key(**filters_view)
+    slug = next((slug for slug, entry in index['visoes'].items() if entry['chave'] == key), None)
+    if slug is None:
+        return None
+    answers = view_answers(os.path.join(reports_dir, slug, ANSWERS_FILE))
+    return ReportQuery(answers, lambda: live_query(source, rows, **filters))
+
+#-------------------------------------------------------------------------------
+# python -m fome_zero.report [pasta de saída] [processos] [--faixas]
+#-------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import sys
+
+    args = [arg for arg in sys.argv[1:] if arg != '--faixas']
+    out_dir = args[0] if len(args) > 0 else None
+    workers = int(args[1]) if len(args) > 1 else None
+
+    start = time.perf_counter()
+    index = generate_reports(out_dir, workers, bands='--faixas' in sys.argv)
+    print(f"{'versao':<18}{index['versao']}")
+    print(f"{'visoes':<18}{len(index['visoes'])}")
+    print(f"{'pasta':<18}{os.path.abspath(out_dir or os.environ.get(REPORTS_ENV) or REPORTS_DIR)}")
+    print(f"{'tempo (s)':<18}{time.perf_counter() - start:.3f}")
@@ -0,0 +1,109 @@
+import os
+
+import pandas as pd
+
+#-------------------------------------------------------------------------------
+# Snapshot colunar (Parquet) do dataset limpo
+#-------------------------------------------------------------------------------
+
+# Colunas de texto com poucos valores distintos viram colunas de dicionário
+CATEGORICAL_COLUMNS = [
+    'country_name',
+    'city',
+    'cuisines',
+    'all_cuisines',
+    'currency',
+    'rating_color',
+    'rating_text',
+    'price_tye',
+    'color_name',
+]
+
+# Tipos numéricos estreitos usados em memória
+NUMERIC_DTYPES = {
+    'country_code': 'int16',
+    'average_cost_for_two': 'int32',
+    'has_table_booking': 'int8',
+    'has_online_delivery': 'int8',
+    'is_delivering_now': 'int8',
+    'switch_to_order_menu': 'int8',
+    'price_range': 'int8',
+    'votes': 'int32',
+}
+
+# A nota tem uma casa decimal: no disco vai como float32 e volta como float64
+# arredondado, para que filtros como between(4.6, 5.0) continuem exatos.
+RATING_COLUMN = 'aggregate_rating'
+
+def snapshot_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+def delta_log_path(csv_path):
+    # Deltas aplicados por fome_zero.ingest, no formato do CSV, em ordem
+    return os.path.splitext(csv_path)[0] + '_deltas.csv'
+
+def optimize_dtypes(df):
+    for col in CATEGORICAL_COLUMNS:
+        if col not in df.columns:
+            continue
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            # O dicionário lido do Parquet pode vir em ordem de aparição
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+        else:
+            df[col] = df[col].astype('category')
+    for col, dtype in NUMERIC_DTYPES.items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+    return df
+
+def is_fresh(snapshot_file, csv_path, columns=()):
+    if not os.path.exists(snapshot_file):
+        return False
+    snapshot_mtime = os.stat(snapshot_file).st_mtime_ns
+    if snapshot_mtime < os.stat(csv_path).st_mtime_ns:
+        return False
+    # O snapshot também precisa conter o último delta registrado
+    log_path = delta_log_path(csv_path)
+    if os.path.exists(log_path) and snapshot_mtime < os.stat(log_path).st_mtime_ns:
+        return False
+
+    # Um snapshot gravado antes de uma coluna nova existir também está velho
+    import pyarrow.parquet as pq
+    return set(columns) <= set(pq.read_schema(snapshot_file).names)
+
+def write_snapshot(df, file_path):
+    df = df.copy()
+    df[RATING_COLUMN] = df[RATING_COLUMN].astype('float32')
+
+    # Escreve em um arquivo temporário e troca de forma atômica, para que
+    # outros processos nunca leiam um snapshot pela metade
+    tmp_path = file_path + '.tmp'
+    df.to_parquet(tmp_path, engine='pyarrow', index=False)
+    os.replace(tmp_path, file_path)
+
+def read_snapshot(file_path, columns=None):
+    df = pd.read_parquet(file_path, engine='pyarrow', columns=columns)
+    if RATING_COLUMN in df.columns:
+        df[RATING_COLUMN] = df[RATING_COLUMN].astype('float64').round(1)
+    return optimize_dtypes(df)
+
+#-------------------------------------------------------------------------------
+# Ingestão: python -m fome_zero.snapshot [caminho do csv]
+#-------------------------------------------------------------------------------
+
+def build_snapshot(csv_path):
+    from fome_zero.data import clean_data
+    from fome_zero.ingest import replay_deltas
+
+    df = replay_deltas(clean_data(pd.read_csv(csv_path)), csv_path)
+    file_path = snapshot_path(csv_path)
+    write_snapshot(df, file_path)
+    return file_path
+
+if __name__ == '__main__':
+    import sys
+
+    from fome_zero.data import DATA_PATH
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    print(f"Snapshot gravado em {build_snapshot(csv_path)}")
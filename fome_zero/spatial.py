@@ -0,0 +1,130 @@
+import numpy as np
+
+from fome_zero.data import DATA_PATH, load_derived
+from fome_zero.geo import longitude_spans
+from fome_zero.profiling import profiled
+
+#-------------------------------------------------------------------------------
+# Índice espacial em grade sobre latitude/longitude
+#-------------------------------------------------------------------------------
+
+# Tamanho da célula do índice, em graus
+CELL_DEGREES = 0.25
+
+class GridIndex:
+    # Os pontos ficam ordenados pela célula (linha, coluna) da grade. Uma
+    # consulta por retângulo vira uma busca binária por linha da grade.
+
+    def __init__(self, latitude, longitude, cell_degrees=CELL_DEGREES):
+        self.latitude = np.asarray(latitude, dtype='float64')
+        self.longitude = np.asarray(longitude, dtype='float64')
+        self.cell_degrees = cell_degrees
+        self.n_rows = int(np.ceil(180 / cell_degrees)) + 1
+        self.n_cols = int(np.ceil(360 / cell_degrees)) + 1
+
+        rows, cols = self.cell_of(self.latitude, self.longitude)
+        keys = rows * self.n_cols + cols
+        self.order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[self.order]
+
+    def __len__(self):
+        return len(self.order)
+
+    def cell_of(self, latitude, longitude):
+        rows = np.floor((np.clip(latitude, -90, 90) + 90) / self.cell_degrees).astype('int64')
+        cols = np.floor((np.clip(longitude, -180, 180) + 180) / self.cell_degrees).astype('int64')
+        return rows, cols
+
+    def query(self, south, west, north, east):
+        # Posições (ordenadas) dos pontos dentro do retângulo. O Leaflet passa
+        # longitudes além de ±180 quando o mapa é arrastado para outra cópia
+        # do mundo; elas dão a volta, e um retângulo que cruza a linha de data
+        # vira dois
+        south, north = max(south, -90.0), min(north, 90.0)
+        if south > north:
+            return np.empty(0, dtype='int64')
+        parts = [self.query_box(south, west, north, east) for west, east in longitude_spans(west, east)]
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+    def query_box(self, south, west, north, east):
+        # Retângulo já dentro de [-90, 90] x [-180, 180], sem cruzar a linha de data
+        (row_start, row_end), (col_start, col_end) = self.cell_of(np.array([south, north]), np.array([west, east]))
+        rows = np.arange(row_start, row_end + 1)
+        starts = np.searchsorted(self.sorted_keys, rows * self.n_cols + col_start, side='left')
+        ends = np.searchsorted(self.sorted_keys, rows * self.n_cols + col_end, side='right')
+
+        candidates = np.concatenate([self.order[start:end] for start, end in zip(starts, ends)] or [np.empty(0, dtype='int64')])
+
+        # As células da borda podem ter pontos fora do retângulo
+        latitude = self.latitude[candidates]
+        longitude = self.longitude[candidates]
+        inside = (latitude >= south) & (latitude <= north) & (longitude >= west) & (longitude <= east)
+        return np.sort(candidates[inside])
+
+def build_grid_index(df):
+    return GridIndex(df['latitude'].to_numpy(), df['longitude'].to_numpy())
+
+def load_grid_index(file_path=DATA_PATH):
+    return load_derived(build_grid_index, file_path)
+
+#-------------------------------------------------------------------------------
+# Seleção do que cabe na área visível do mapa
+#-------------------------------------------------------------------------------
+
+# Máximo de marcadores individuais enviados ao navegador por nível de zoom
+MAX_MARKERS_BY_ZOOM = {0: 0, 1: 0, 2: 0, 3: 100, 4: 200, 5: 300, 6: 400, 7: 500}
+MAX_MARKERS = 1000
+
+# Células de agregação com mais pontos que isto viram um contador
+DENSE_CELL_POINTS = 20
+
+# Visão inicial do mapa: o mundo inteiro no zoom 2
+DEFAULT_VIEW = ((-90.0, -180.0, 90.0, 180.0), 2)
+
+def parse_view(map_state):
+    # Converte o retorno do st_folium em ((sul, oeste, norte, leste), zoom)
+    try:
+        bounds = map_state['bounds']
+        south_west, north_east = bounds['_southWest'], bounds['_northEast']
+        view = (south_west['lat'], south_west['lng'], north_east['lat'], north_east['lng'])
+        if None in view:
+            return DEFAULT_VIEW
+        return tuple(float(value) for value in view), int(map_state.get('zoom') or DEFAULT_VIEW[1])
+    except (KeyError, TypeError):
+        return DEFAULT_VIEW
+
+def max_markers(zoom):
+    return MAX_MARKERS_BY_ZOOM.get(zoom, MAX_MARKERS)
+
+def aggregation_degrees(zoom):
+    # Cerca de 8 células de agregação por "tile" do Leaflet naquele zoom
+    return 360 / (2 ** max(zoom, 0) * 8)
+
+@profiled()
+def viewport_selection(index, bounds, zoom, selected=None):
+    # Retorna (posições de marcadores individuais, contadores agregados), onde
+    # os contadores são um dict com latitude, longitude e quantidade por célula
+    positions = index.query(*bounds)
+    if selected is not None:
+        positions = positions[selected[positions]]
+
+    degrees = aggregation_degrees(zoom)
+    latitude = index.latitude[positions]
+    longitude = index.longitude[positions]
+    cells = np.floor(latitude / degrees).astype('int64') * 1_000_000 + np.floor(longitude / degrees).astype('int64')
+    unique_cells, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+
+    dense = counts[inverse] > DENSE_CELL_POINTS
+    if (~dense).sum() > max_markers(zoom):
+        dense[:] = True
+
+    # Contadores no centroide dos pontos de cada célula densa
+    dense_cells = inverse[dense]
+    totals = np.bincount(dense_cells, minlength=len(unique_cells))
+    has_points = totals > 0
+    clusters = {
+        'latitude': (np.bincount(dense_cells, weights=latitude[dense], minlength=len(unique_cells))[has_points] / totals[has_points]),
+        'longitude': (np.bincount(dense_cells, weights=longitude[dense], minlength=len(unique_cells))[has_points] / totals[has_points]),
+        'count': totals[has_points],
+    }
+    return positions[~dense], clusters
@@ -0,0 +1,347 @@
+import json
+import os
+import shutil
+import time
+from functools import lru_cache
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.caching import LRUCache, filter_key
+from fome_zero.cube import build_cube, load_cube, rating_bounds
+from fome_zero.data import DATA_PATH, clean_data, dataset_version, load_and_clean_data, load_derived
+from fome_zero.filters import Selection, load_filter_index, position_dtype, session_selection
+from fome_zero.incidence import load_incidence, split_cuisines
+from fome_zero.ingest import CUBE_LABELS, combine_cells, cube_partials, read_delta_log
+from fome_zero.query import sql_literal
+from fome_zero.snapshot import CATEGORICAL_COLUMNS, is_fresh, optimize_dtypes, snapshot_path
+
+#-------------------------------------------------------------------------------
+# Ingestão em blocos para datasets maiores que a memória
+#-------------------------------------------------------------------------------
+
+# FOME_ZERO_STORE aponta para um diretório gerado por python -m fome_zero.store.
+# Com ele as páginas respondem pelo cubo e só leem as partições quando
+# precisam de linhas (mapa, rankings, download).
+STORE_ENV = 'FOME_ZERO_STORE'
+
+# Orçamento de memória da ingestão, em MB
+INGEST_MEMORY_MB = int(os.environ.get('FOME_ZERO_INGEST_MB') or 256)
+
+# Memória de um bloco em relação ao CSV cru carregado: o bloco lido, a cópia
+# limpa e a cópia em texto gravada nas partições
+CHUNK_OVERHEAD = 4
+
+PARTITION_COLUMN = 'country_name'
+
+# Posição da linha no dataset limpo completo, para devolver as linhas lidas na
+# mesma ordem (e com o mesmo índice) do modo em memória
+ROW_COLUMN = 'row_number'
+
+# Colunas com opções nos filtros, na ordem de primeira aparição
+OPTION_COLUMNS = ['country_name', 'city', 'cuisines']
+
+META_FILE = 'meta.json'
+CUBE_FILE = 'cube.parquet'
+
+def store_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '_store'
+
+def chunk_rows_for(csv_path, memory_mb=INGEST_MEMORY_MB, sample_rows=1000):
+    # Linhas por bloco que cabem no orçamento, estimadas por uma amostra do CSV
+    sample = pd.read_csv(csv_path, nrows=sample_rows)
+    row_bytes = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+    return max(1_000, int(memory_mb * 2 ** 20 / (row_bytes * CHUNK_OVERHEAD)))
+
+def sorted_contains(sorted_values, values):
+    # Quais values estão em sorted_values (ordenado), por busca binária
+    if not len(sorted_values):
+        return np.zeros(len(values), dtype=bool)
+    found = np.searchsorted(sorted_values, values)
+    found[found == len(sorted_values)] = 0
+    return sorted_values[found] == values
+
+def write_partitions(df, store_dir, chunk):
+    # Um arquivo por país e bloco. As categorias vão como texto (o Parquet já
+    # codifica por dicionário) para todos os arquivos terem o mesmo esquema.
+    plain = df.astype({column: object for column in CATEGORICAL_COLUMNS if column in df.columns})
+    files = {}
+    for country, part in plain.groupby(PARTITION_COLUMN, sort=False):
+        path = os.path.join(f"{PARTITION_COLUMN}={quote(country, safe='')}", f'part-{chunk:05d}.parquet')
+        os.makedirs(os.path.join(store_dir, os.path.dirname(path)), exist_ok=True)
+        part.to_parquet(os.path.join(store_dir, path), engine='pyarrow', index=False)
+        files[country] = path
+    return files
+
+def ingest_csv(csv_path, store_dir=None, chunk_rows=None):
+    store_dir = store_dir or store_path(csv_path)
+    chunk_rows = chunk_rows or chunk_rows_for(csv_path)
+
+    # Monta a versão nova ao lado e troca o diretório inteiro no final
+    tmp_dir = store_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    cube = None
+    seen = np.empty(0, dtype='int64')
+    partitions = {}
+    options = {column: {} for column in OPTION_COLUMNS}
+    listed = set()
+    rows = chunks = 0
+    columns = []
+
+    # Deltas já aplicados (fome_zero.ingest): os ids que eles trazem saem de
+    # cada bloco do CSV e as linhas novas entram no fim, como no modo em memória
+    delta = read_delta_log(csv_path)
+    if delta is not None:
+        delta = delta.drop_duplicates('restaurant_id', keep='last').reset_index(drop=True)
+        replaced = np.sort(delta['restaurant_id'].unique())
+
+    def cleaned_chunks():
+        for raw in pd.read_csv(csv_path, chunksize=chunk_rows):
+            # Mesma limpeza da carga completa; o dropna é por linha, então vale
+            # bloco a bloco
+            df = clean_data(raw)
+            del raw
+            if delta is not None:
+                df = df[~sorted_contains(replaced, df['restaurant_id'].to_numpy())].reset_index(drop=True)
+            yield df
+        if delta is not None:
+            yield delta
+
+    for chunk, df in enumerate(cleaned_chunks()):
+        if not len(df):
+            continue
+        columns = df.columns.tolist()
+        df[ROW_COLUMN] = np.arange(rows, rows + len(df), dtype='int64')
+        rows += len(df)
+        chunks += 1
+
+        # Ids vistos em blocos anteriores não contam de novo como restaurantes
+        # distintos. É o único estado que cresce com a entrada: 8 bytes por id.
+        ids = df['restaurant_id'].to_numpy()
+        first_seen = ~df['restaurant_id'].duplicated().to_numpy() & ~sorted_contains(seen, ids)
+        fresh = np.sort(ids[first_seen])
+        seen = np.insert(seen, np.searchsorted(seen, fresh), fresh)
+
+        # O cubo acumulado tem o tamanho das células, não das linhas
+        part = build_cube(df, first_seen)
+        cube = part if cube is None else combine_cells([cube_partials(cube), cube_partials(part)], part)
+
+        for column in OPTION_COLUMNS:
+            options[column].update(dict.fromkeys(df[column].unique().tolist()))
+        for value in df['all_cuisines'].unique().tolist():
+            listed.update(split_cuisines(value))
+
+        for country, path in write_partitions(df, tmp_dir, chunk).items():
+            partitions.setdefault(country, []).append(path)
+
+    cube.to_parquet(os.path.join(tmp_dir, CUBE_FILE), engine='pyarrow', index=False)
+    meta = {
+        'version': f"{time.time_ns():x}-{rows:x}",
+        'source': os.path.abspath(csv_path),
+        'rows': rows,
+        'chunk_rows': chunk_rows,
+        'chunks': chunks,
+        'columns': columns,
+        'partitions': partitions,
+        'options': {column: list(values) for column, values in options.items()},
+        'listed_cuisines': sorted(listed),
+    }
+    with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as file:
+        json.dump(meta, file, ensure_ascii=False)
+
+    old_dir = store_dir + '.old'
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(store_dir):
+        os.replace(store_dir, old_dir)
+    os.replace(tmp_dir, store_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    return {
+        'diretorio': store_dir,
+        'linhas': rows,
+        'blocos': chunks,
+        'linhas_por_bloco': chunk_rows,
+        'particoes': len(partitions),
+        'arquivos': sum(len(files) for files in partitions.values()),
+        'restaurantes': len(seen),
+        'celulas_cubo': len(cube),
+    }
+
+#-------------------------------------------------------------------------------
+# Leitura das partições sob demanda
+#-------------------------------------------------------------------------------
+
+# Linhas lidas (e estruturas derivadas delas) mantidas por processo,
+# compartilhadas entre as sessões
+STORE_CACHE_ENTRIES = 16
+
+class StoreSelection(Selection):
+    # Seleção lida das partições só quando alguém usa as linhas, e só com as
+    # colunas que a página declarou. Pedidos por outras colunas (o download)
+    # voltam às partições.
+
+    def __init__(self, store, columns, filters, positions=None):
+        self.store = store
+        self.columns = columns
+        self.filters = filters
+        self.key = filter_key(version=store.version, columns=columns, **filters)
+        self._positions = positions
+
+    @property
+    def df(self):
+        return self.store.cached(self.key, lambda: self.store.read(self.columns, **self.filters))
+
+    @property
+    def positions(self):
+        if self._positions is None:
+            return np.arange(len(self.df), dtype=position_dtype(len(self.df)))
+        return self._positions
+
+    def subset(self, positions):
+        return StoreSelection(self.store, self.columns, self.filters, positions)
+
+    def frame(self, columns=None):
+        if columns is not None and set(columns) <= set(self.df.columns):
+            return super().frame(columns)
+        return self.store.read(columns, **self.filters).iloc[self.positions]
+
+class PartitionStore:
+
+    def __init__(self, store_dir):
+        with open(os.path.join(store_dir, META_FILE), encoding='utf-8') as file:
+            meta = json.load(file)
+        self.store_dir = store_dir
+        self.version = meta['version']
+        self.size = meta['rows']
+        self.columns = meta['columns']
+        self.partitions = meta['partitions']
+        self.listed = meta['listed_cuisines']
+        self._options = meta['options']
+        # Só as dimensões voltam a ser categorias; as parciais ficam em int64
+        cube = pd.read_parquet(os.path.join(store_dir, CUBE_FILE), engine='pyarrow')
+        self.cube = cube.astype({column: pd.CategoricalDtype(sorted(cube[column].unique())) for column in CUBE_LABELS})
+        self._cache = LRUCache(STORE_CACHE_ENTRIES, name='partições')
+
+    def options(self, column):
+        return self._options[column]
+
+    def listed_cuisines(self):
+        return self.listed
+
+    def files(self, countries=None):
+        wanted = self.partitions if countries is None else set(countries)
+        return [os.path.join(self.store_dir, path) for name, paths in self.partitions.items() if name in wanted for path in paths]
+
+    def read(self, columns=None, countries=None, rating_range=None, cities=None, cuisines=None):
+        import pyarrow.dataset as ds
+
+        # O país escolhe os arquivos; o resto vira filtro da leitura, aplicado
+        # pelo pyarrow antes de montar o DataFrame
+        condition = ds.scalar(True)
+        if rating_range is not None:
+            low, high = rating_bounds(rating_range)
+            condition &= (ds.field('aggregate_rating') >= low) & (ds.field('aggregate_rating') < high)
+        for column, values in (('city', cities), ('cuisines', cuisines)):
+            if values is not None and not set(self.options(column)) <= set(values):
+                condition &= ds.field(column).isin(list(values))
+
+        files = self.files(countries)
+        if not files:
+            # Nenhum país: lê o esquema de um arquivo qualquer, sem linhas
+            files, condition = self.files()[:1], ds.scalar(False)
+
+        columns = self.columns if columns is None else list(columns)
+        text = [column for column in CATEGORICAL_COLUMNS if column in self.columns]
+        file_format = ds.ParquetFileFormat(read_options=ds.ParquetReadOptions(dictionary_columns=text))
+        table = ds.dataset(files, format=file_format).to_table(columns=columns + [ROW_COLUMN], filter=condition)
+
+        df = table.to_pandas()
+        df = df.iloc[np.argsort(df[ROW_COLUMN].to_numpy(), kind='stable')].set_index(ROW_COLUMN)
+        df.index.name = None
+        return optimize_dtypes(df)
+
+    def cached(self, key, build):
+        return self._cache.get_or_build(key, build)
+
+    def select(self, state, key, columns=None, **filters):
+        # A sessão não guarda nada: as linhas lidas ficam no cache do processo
+        return StoreSelection(self, columns, filters)
+
+    def derived(self, selection, builder):
+        # Índices (grade espacial, incidência) sobre as linhas da seleção
+        key = (selection.key, builder.__module__, builder.__qualname__)
+        return self.cached(key, lambda: builder(selection.df))
+
+    def sql_table(self, countries=None):
+        # Só os arquivos dos países escolhidos entram na consulta; sem nenhum
+        # país, um arquivo basta para o esquema (o filtro já é FALSE)
+        files = self.files(countries) or self.files()[:1]
+        return f"read_parquet([{', '.join(sql_literal(path) for path in files)}], hive_partitioning = false)"
+
+@lru_cache(maxsize=4)
+def open_store(store_dir, meta_mtime_ns):
+    return PartitionStore(store_dir)
+
+def load_store(store_dir):
+    # Reabre quando uma nova ingestão troca o diretório
+    meta_mtime_ns = os.stat(os.path.join(store_dir, META_FILE)).st_mtime_ns
+    return open_store(os.path.abspath(store_dir), meta_mtime_ns)
+
+#-------------------------------------------------------------------------------
+# Fonte de dados das páginas: memória ou partições
+#-------------------------------------------------------------------------------
+
+class MemorySource:
+    # Dataset inteiro em memória, com os índices e o cubo derivados dele. Tem
+    # a mesma interface de PartitionStore.
+
+    def __init__(self, file_path=DATA_PATH):
+        self.file_path = file_path
+        self.df = load_and_clean_data(file_path)
+        self.index = load_filter_index(file_path)
+        self.cube = load_cube(file_path)
+        self.size = len(self.df)
+        self.version = dataset_version(file_path)
+
+    def options(self, column):
+        return self.index.options(column)
+
+    def listed_cuisines(self):
+        return load_incidence(self.file_path).cuisines.tolist()
+
+    def select(self, state, key, columns=None, **filters):
+        return session_selection(state, key, self.df, self.index, **filters)
+
+    def derived(self, selection, builder):
+        return load_derived(builder, self.file_path)
+
+    def sql_table(self, countries=None):
+        # O snapshot colunar quando está em dia; senão o próprio DataFrame
+        snapshot_file = snapshot_path(self.file_path)
+        if is_fresh(snapshot_file, self.file_path, CATEGORICAL_COLUMNS):
+            return f"read_parquet({sql_literal(snapshot_file)})"
+        return self.df
+
+def load_source(file_path=DATA_PATH):
+    store_dir = os.environ.get(STORE_ENV)
+    return load_store(store_dir) if store_dir else MemorySource(file_path)
+
+#-------------------------------------------------------------------------------
+# python -m fome_zero.store [caminho do csv] [diretório de saída] [memória em MB]
+#-------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import sys
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    store_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    memory_mb = int(sys.argv[3]) if len(sys.argv) > 3 else INGEST_MEMORY_MB
+
+    start = time.perf_counter()
+    summary = ingest_csv(csv_path, store_dir, chunk_rows_for(csv_path, memory_mb))
+    for name, value in summary.items():
+        print(f"{name:<18}{value}")
+    print(f"{'tempo (s)':<18}{time.perf_counter() - start:.3f}")
@@ -0,0 +1,76 @@
+from functools import lru_cache
+
+import streamlit as st
+
+from fome_zero.caching import filter_key
+from fome_zero.export import EXPORT_FORMATS, cached_export, is_cached
+
+#-------------------------------------------------------------------------------
+# Componentes de interface compartilhados entre as páginas
+#-------------------------------------------------------------------------------
+
+# Resolução dos logos em relação à largura exibida (telas de alta densidade)
+LOGO_SCALE = 2
+
+@lru_cache(maxsize=None)
+def load_logo(file_path, width):
+    # Decodifica cada logo uma vez por processo e já no tamanho de exibição:
+    # os arquivos originais têm milhares de pixels e o Streamlit recodifica a
+    # imagem a cada rerun
+    from PIL import Image
+
+    image = Image.open(file_path)
+    size = (width * LOGO_SCALE, width * LOGO_SCALE * image.height // image.width)
+    image.draft('RGB', size)
+    image.thumbnail(size)
+    return image
+
+#-------------------------------------------------------------------------------
+# Filtros compartilhados entre as páginas
+#-------------------------------------------------------------------------------
+
+# O valor de cada filtro fica em filtro_<nome>, uma chave que não é de widget:
+# o Streamlit apaga o estado dos widgets que não aparecem na página atual
+SHARED_FILTER_PREFIX = 'filtro_'
+
+def store_filter(widget_key, shared_key):
+    st.session_state[shared_key] = st.session_state[widget_key]
+
+def shared_filter(widget, label, name, default, **kwargs):
+    # Cria o widget já com o último valor escolhido em qualquer página
+    shared_key = SHARED_FILTER_PREFIX + name
+    widget_key = f'_{shared_key}'
+    value = st.session_state.get(shared_key, default)
+    if isinstance(value, list) and 'options' in kwargs:
+        # Só os valores que existem entre as opções desta página
+        options = set(kwargs['options'])
+        value = [item for item in value if item in options]
+    st.session_state[widget_key] = value
+    return widget(label, key=widget_key, on_change=store_filter, args=(widget_key, shared_key), **kwargs)
+
+def download_sidebar(build_df, page, version=None, **filters):
+    if version is None:
+        # Importado aqui para que a Home não carregue o pandas só pelo logo
+        from fome_zero.data import dataset_version
+        version = dataset_version()
+
+    # O arquivo só é gerado quando alguém pede, e fica em cache pelo estado dos
+    # filtros: mexer no slider não serializa mais o dataset a cada rerun
+    formato = st.sidebar.selectbox(
+        "Formato do download",
+        options=list(EXPORT_FORMATS),
+        format_func=lambda fmt: EXPORT_FORMATS[fmt][0],
+        key=f'{page}_formato_download'
+    )
+    key = filter_key(page=page, version=version, **filters)
+    _, extensao, mime = EXPORT_FORMATS[formato]
+
+    if not is_cached(key, formato) and not st.sidebar.button("Preparar download", key=f'{page}_preparar_download'):
+        return
+
+    st.sidebar.download_button(
+        label="Download dados",
+        data=cached_export(key, formato, build_df),
+        file_name=f'dados_tratados.{extensao}',
+        mime=mime
+    )
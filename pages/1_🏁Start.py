@@ -1,171 +1,66 @@
-from haversine import haversine
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import folium
 import streamlit as st
 from streamlit_folium import st_folium
-from PIL import Image
-import datetime as datetime
-import inflection
-from folium.plugins import MarkerCluster
 
-st.set_page_config(page_title='Geral', page_icon='🎲', layout='wide')
-
-#-------------------------------------------------------------------------------
-# Funções de apoio e gráficos
-#-------------------------------------------------------------------------------
-
-def create_bar_chart(dataframe, x, y, title, text, labels):
-    fig = px.bar(dataframe, x=x, y=y, text=text, title=title, labels=labels)
-    fig.update_traces(textposition='outside')
-    return fig
-
-def create_pie_chart(dataframe, values, names, title):
-    fig = px.pie(dataframe, values=values, names=names, title=title)
-    return fig
-
-def create_map(dataframe):
-    m = folium.Map(location=[0, 0], zoom_start=2)
-    marker_cluster = MarkerCluster().add_to(m)
-
-    for index, row in dataframe.iterrows():
-        folium.Marker(location=[row['latitude'], row['longitude']],
-                      popup=f"<b>{row['restaurant_name']}</b><br>\n{row['city']} - {row['country_name']}<br>\nAvaliação: {row['aggregate_rating']}\n", 
-                      tooltip=row['restaurant_name']).add_to(marker_cluster)
-    return m
-
-#-------------------------------------------------------------------------------
-# Função para limpar e carregar os dados
-#-------------------------------------------------------------------------------
-
-COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "England",
-    216: "United States of America",
-}
-
-COLORS = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-}
-
-def country_name(country_id):
-    return COUNTRIES.get(country_id, "Unknown")
-
-def create_price_tye(price_range):
-    if price_range == 1:
-        return "cheap"
-    elif price_range == 2:
-        return "normal"
-    elif price_range == 3:
-        return "expensive"
-    else:
-        return "gourmet"
-
-def color_name(color_code):
-    return COLORS.get(color_code, "unknown")
-
-def rename_columns(dataframe):
-    df = dataframe.copy()
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-    return df
+from fome_zero.caching import filter_key
+from fome_zero.dashboard import create_start_charts, preprocess_start_data
+from fome_zero.density import DENSITY_WEIGHTS, build_density, cached_density
+from fome_zero.geo import nearby_restaurants, wrap_longitude
+from fome_zero.maps import CLIENT_MAP_MAX_ROWS, DEFAULT_MAP_MODE, FAST_MAP_COLUMNS, MAP_MODES, bounded_map_mode, build_map, create_base_map, create_density_layer, create_viewport_layer
+from fome_zero.profiling import finish_profiling, stage, start_profiling
+from fome_zero.query import open_query
+from fome_zero.spatial import build_grid_index, parse_view, viewport_selection
+from fome_zero.store import load_source
+from fome_zero.ui import download_sidebar, load_logo, shared_filter
 
-def load_and_clean_data(file_path):
-    # Carrega o dataset
-    df = pd.read_csv(file_path)
-
-    # Adiciona o nome do país
-    df['Country Name'] = df['Country Code'].apply(country_name)
-
-    # Adiciona o tipo de preço
-    df['Price_Tye'] = df['Price range'].apply(create_price_tye)
-
-    # Adiciona o nome da cor
-    df['Color_Name'] = df['Rating color'].apply(color_name)
-
-    # Renomeia as colunas
-    df = rename_columns(df)
-
-    # Remove valores ausentes e reseta o índice
-    df.dropna(inplace=True)
-    df.reset_index(drop=True, inplace=True)
-
-    # Simplifica a coluna "cuisines" para apenas o primeiro tipo de culinária
-    if "cuisines" in df.columns:
-        df["cuisines"] = df["cuisines"].apply(lambda x: x.split(",")[0] if isinstance(x, str) else x)
-
-    return df
+st.set_page_config(page_title='Geral', page_icon='🎲', layout='wide')
+start_profiling('inicio')
 
 #-------------------------------------------------------------------------------
 # Carregar e processar os dados
 #-------------------------------------------------------------------------------
 
-#file_path = r'C:\Users\Giovanna\OneDrive\Documentos\repos\FTC_projeto_aluno\dataset\zomato.csv'
-# df = pd.read_csv('dataset\\zomato.csv')
-df1 = load_and_clean_data('dataset/zomato.csv')
+# Colunas das linhas usadas pelo mapa e pela busca de restaurantes próximos
+# (no modo particionado, só elas são lidas)
+COLUNAS_LINHAS = FAST_MAP_COLUMNS + ['average_cost_for_two', 'currency', 'votes']
 
-image = Image.open('logo-filtro.jpg')
+with stage('carregar dados'):
+    fonte = load_source()
+
+image = load_logo('logo-filtro.jpg', 120)
 st.sidebar.image(image, width=120)
 
 # Filtros - país
-country_option = st.sidebar.multiselect(
+country_option = shared_filter(
+    st.sidebar.multiselect,
     "Em qual país você quer encontrar um restaurante?",
-    df1['country_name'].unique(),  # Garantir que 'country_name' exista
-    default=df1['country_name'].unique()
+    'paises',
+    fonte.options('country_name'),
+    options=fonte.options('country_name')
 )
 
 # Filtros - classificação
-rating_slider = st.sidebar.slider(
+rating_slider = shared_filter(
+    st.sidebar.slider,
     "Qual classificação de restaurante você deseja ver?",
+    'nota',
+    (0.0, 5.0),
     min_value=0.0,
     max_value=5.0,
-    value=(0.0, 5.0),
     step=0.1,
     format="%.1f"
 )
 st.sidebar.markdown("""---""")
 
 # Aplicar filtros
-df1 = df1[df1['country_name'].isin(country_option)]
-df1 = df1[df1['aggregate_rating'].between(rating_slider[0], rating_slider[1])]
+with stage('filtros', rows_in=fonte.size) as etapa:
+    selecao = fonte.select(st.session_state, 'selecao', columns=COLUNAS_LINHAS, countries=country_option, rating_range=rating_slider)
+    consulta = open_query(fonte, countries=country_option, rating_range=rating_slider)
+    etapa['rows_out'] = len(selecao)
 
 st.sidebar.markdown("### Powered by Comunidade DS")
 
-# Convertendo o DataFrame para CSV
-csv = df1.to_csv(index=False)
-
-# Botão de download
-st.sidebar.download_button(
-    label="Download dados",
-    data=csv,
-    file_name='dados_tratados.csv',
-    mime='text/csv'
-)
+# Botão de download, gerado sob demanda
+download_sidebar(selecao.frame, 'inicio', version=fonte.version, countries=country_option, rating_range=rating_slider)
 
 #-------------------------------------------------------------------------------
 # Dashboard - Geral
@@ -175,11 +70,12 @@ st.header("Início")
 st.subheader("Visão Geral dos Restaurantes no Mundo")
 st.markdown("Uma análise global dos restaurantes cadastrados no programa Fome Zero")
 
-total_restaurantes = df1.restaurant_id.nunique()
-total_paises = df1.country_code.nunique()
-total_cidades = df1.city.nunique()
-total_avaliacoes = df1.votes.sum()
-total_culinarias = df1.cuisines.nunique()
+totais = consulta.totals()
+total_restaurantes = totais['restaurantes_unicos']
+total_paises = totais['paises']
+total_cidades = totais['cidades']
+total_avaliacoes = totais['avaliacoes']
+total_culinarias = totais['culinarias']
 
 # Layout cards
 col1, col2, col3, col4, col5 = st.columns(5)
@@ -195,33 +91,74 @@ with col4:
 with col5:
     st.metric(label="🍻 Tipos de Culinária", value=total_culinarias) 
 
-# Gráfico 1: Distribuição dos tipos de culinária
-st.markdown("### Distribuição dos Tipos de Culinária")
-culinarias = df1['cuisines'].value_counts().head(10).reset_index()
-culinarias.columns = ['Culinária', 'Quantidade']
-fig_culinarias = create_bar_chart(
-    culinarias, 
-    x='Culinária', 
-    y='Quantidade', 
-    title="Top 10 Tipos de Culinária Mais Frequentes", 
-    text='Quantidade', 
-    labels={'Quantidade': 'Número de Restaurantes', 'Culinária': 'Tipo de Culinária'}
-)
-st.plotly_chart(fig_culinarias, use_container_width=True)
-
-# Gráfico 2: Distribuição por País
-st.markdown("### Distribuição dos Restaurantes por País")
-paises = df1['country_name'].value_counts().reset_index()
-paises.columns = ['País', 'Quantidade']
-fig_paises = create_pie_chart(
-    paises, 
-    values='Quantidade', 
-    names='País', 
-    title="Participação dos Países no Fome Zero"
-)
-st.plotly_chart(fig_paises, use_container_width=True)
-
-# Mapa Interativo
-st.markdown("### Mapa Interativo dos Restaurantes")
-m = create_map(df1)
-st_folium(m, width=700, height=500)
+# Gráficos: distribuição dos tipos de culinária e por país
+culinarias, paises = preprocess_start_data(consulta)
+for secao, fig in create_start_charts(culinarias, paises):
+    st.markdown(f"### {secao}")
+    st.plotly_chart(fig, use_container_width=True)
+
+# O mapa e a busca de restaurantes próximos formam um fragmento: mexer no
+# mapa ou nos campos abaixo dele reexecuta só esta parte, sem refazer os
+# filtros, as métricas e os gráficos acima
+@st.fragment
+def map_section(fonte, selecao, filtros):
+    # Mapa Interativo
+    st.markdown("### Mapa Interativo dos Restaurantes")
+    modo_mapa = st.radio(
+        "Modo do mapa",
+        options=list(MAP_MODES),
+        index=list(MAP_MODES).index(DEFAULT_MAP_MODE),
+        format_func=MAP_MODES.get,
+        horizontal=True
+    )
+    # Os modos que mandam a seleção inteira ao navegador só valem para
+    # seleções pequenas
+    if bounded_map_mode(modo_mapa, len(selecao)) != modo_mapa:
+        st.info(f"Este modo mostra até {CLIENT_MAP_MAX_ROWS} restaurantes; com {len(selecao)} selecionados, o mapa usa a área visível.")
+        modo_mapa = bounded_map_mode(modo_mapa, len(selecao))
+    indice = fonte.derived(selecao, build_grid_index)
+    selecionados = selecao.mask()
+
+    if modo_mapa == 'viewport':
+        # Só os restaurantes filtrados dentro da área visível, com contadores
+        # para as regiões densas. A área vem da última interação com o mapa.
+        area, zoom = parse_view(st.session_state.get('mapa_restaurantes'))
+        posicoes, agregados = viewport_selection(indice, area, zoom, selecionados)
+        camada = create_viewport_layer(selecao.df.iloc[posicoes], agregados)
+        mapa = st_folium(create_base_map(), key='mapa_restaurantes', width=700, height=500,
+                         feature_group_to_add=camada, returned_objects=['bounds', 'zoom', 'last_clicked'])
+    elif modo_mapa == 'density':
+        # Grade calculada uma vez por filtros e peso, para todos os níveis de
+        # zoom; o navegador recebe só as células da área visível
+        peso = st.radio("Peso da densidade", options=list(DENSITY_WEIGHTS), format_func=DENSITY_WEIGHTS.get, horizontal=True)
+        chave = filter_key(version=fonte.version, weight=peso, **filtros)
+        niveis = cached_density(chave, lambda: build_density(indice, selecionados, selecao.df, peso))
+        area, zoom = parse_view(st.session_state.get('mapa_densidade'))
+        camada = create_density_layer(niveis.cells(zoom, area))
+        mapa = st_folium(create_base_map(), key='mapa_densidade', width=700, height=500,
+                         feature_group_to_add=camada, returned_objects=['bounds', 'zoom', 'last_clicked'])
+    else:
+        m = build_map(selecao.frame(FAST_MAP_COLUMNS), modo_mapa)
+        mapa = st_folium(m, width=700, height=500, returned_objects=['last_clicked'])
+
+    # Restaurantes próximos a um ponto clicado no mapa ou digitado
+    st.markdown("### Restaurantes Próximos")
+    clique = (mapa or {}).get('last_clicked') or {'lat': 28.6139, 'lng': 77.2090}
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        latitude = st.number_input("Latitude", min_value=-90.0, max_value=90.0, value=float(clique['lat']), format="%.4f")
+    with col2:
+        longitude = st.number_input("Longitude", min_value=-180.0, max_value=180.0, value=wrap_longitude(float(clique['lng'])), format="%.4f")
+    with col3:
+        raio = st.number_input("Raio em km (0 = sem limite)", min_value=0.0, value=5.0, step=1.0)
+    with col4:
+        quantidade = st.number_input("Quantidade", min_value=1, max_value=100, value=10)
+
+    proximos = nearby_restaurants(selecao.df, indice, latitude, longitude,
+                                  radius_km=raio or None, k=int(quantidade), selected=selecionados)
+    st.dataframe(proximos, use_container_width=True)
+
+map_section(fonte, selecao, {'countries': country_option, 'rating_range': rating_slider})
+
+# Painel de perfil (só com FOME_ZERO_PROFILE=1 ou ?profile=1)
+finish_profiling()
@@ -1,123 +1,65 @@
-from haversine import haversine
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import folium
 import streamlit as st
-from streamlit_folium import st_folium
-from PIL import Image
-import datetime as datetime
-import inflection
-from folium.plugins import MarkerCluster
 
-st.set_page_config(page_title='Tipos de Culinária', page_icon='🍽️', layout='wide')
-
-#-------------------------------------------------------------------------------
-# Funções de apoio e gráficos
-#-------------------------------------------------------------------------------
-
-def calculate_cuisine_metrics(df):
-    return {
-        "tipos_culinaria": df['cuisines'].nunique(),
-        "restaurantes_totais": df['restaurant_id'].nunique(),
-        "media_geral_avaliacoes": round(df['aggregate_rating'].mean(), 2)
-    }
-
-def create_bar_chart(dataframe, x, y, text, title, labels):
-    fig = px.bar(dataframe, x=x, y=y, text=text, title=title, labels=labels)
-    fig.update_traces(textposition='outside')
-    return fig
-
-def create_summary_table(*dataframes):
-    summary = dataframes[0]
-    for df in dataframes[1:]:
-        summary = pd.merge(summary, df, on='cuisines')
-    return summary
-
-def preprocess_cuisine_data(df):
-    maior_menor_avaliacao = df.groupby(['cuisines', 'restaurant_name'])['aggregate_rating'].mean().reset_index()
-    maior_avaliacao = maior_menor_avaliacao.sort_values(['cuisines', 'aggregate_rating'], ascending=[True, False])
-    menor_avaliacao = maior_menor_avaliacao.sort_values(['cuisines', 'aggregate_rating'], ascending=[True, True])
-
-    custo_culinaria = df.groupby('cuisines')['average_cost_for_two'].mean().reset_index()
-    custo_culinaria = custo_culinaria.sort_values(by='average_cost_for_two', ascending=False).round(2)
-
-    nota_culinaria = df[df['cuisines'] != "Others"].groupby('cuisines')['aggregate_rating'].mean().reset_index()
-    nota_culinaria = nota_culinaria.sort_values(by='aggregate_rating', ascending=False).round(2)
+from fome_zero.dashboard import RANKING_COLUMNS, RANKING_SIZE, calculate_cuisine_metrics, create_distribution_chart, preprocess_cuisine_data
+from fome_zero.incidence import CUISINE_MODES, build_incidence
+from fome_zero.leaderboards import LEADERBOARD_GROUPS
+from fome_zero.profiling import finish_profiling, stage, start_profiling
+from fome_zero.query import PandasQuery, open_query
+from fome_zero.store import load_source
+from fome_zero.ui import download_sidebar, load_logo, shared_filter
 
-    online_delivery = df[(df['is_delivering_now'] == 1) & (df['has_online_delivery'] == 1)]
-    mais_online_entregas = online_delivery.groupby('cuisines')['restaurant_id'].count().reset_index()
-    mais_online_entregas = mais_online_entregas.sort_values(by='restaurant_id', ascending=False)
-
-    return maior_avaliacao, menor_avaliacao, custo_culinaria, nota_culinaria, mais_online_entregas
-
-#-------------------------------------------------------------------------------
-# Função para limpar e carregar os dados
-#-------------------------------------------------------------------------------
-
-def country_name(country_id):
-    COUNTRIES = {
-        1: "India",
-        14: "Australia",
-        30: "Brazil",
-        37: "Canada",
-        94: "Indonesia",
-        148: "New Zeland",
-        162: "Philippines",
-        166: "Qatar",
-        184: "Singapure",
-        189: "South Africa",
-        191: "Sri Lanka",
-        208: "Turkey",
-        214: "United Arab Emirates",
-        215: "England",
-        216: "United States of America",
-    }
-    return COUNTRIES.get(country_id, "Unknown")
-
-def rename_columns(dataframe):
-    df = dataframe.copy()
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-    return df
-
-def load_and_clean_data(file_path):
-    df = pd.read_csv(file_path)
-    df['Country Name'] = df['Country Code'].apply(country_name)
-    df = rename_columns(df)
-    df.dropna(inplace=True)
-    df.reset_index(drop=True, inplace=True)
-    if "cuisines" in df.columns:
-        df["cuisines"] = df["cuisines"].apply(lambda x: x.split(",")[0] if isinstance(x, str) else x)
-    return df
+st.set_page_config(page_title='Tipos de Culinária', page_icon='🍽️', layout='wide')
+start_profiling('culinarias')
 
 #-------------------------------------------------------------------------------
 # Carregar e processar os dados
 #-------------------------------------------------------------------------------
 
-#file_path = r'C:\Users\Giovanna\OneDrive\Documentos\repos\FTC_projeto_aluno\dataset\zomato.csv'
-# df = pd.read_csv('dataset\\zomato.csv')
-df1 = load_and_clean_data('dataset/zomato.csv')
+# Colunas das linhas usadas pelos rankings e pela matriz de incidência (no
+# modo particionado, só elas são lidas)
+COLUNAS_LINHAS = RANKING_COLUMNS + ['all_cuisines', 'restaurant_id', 'votes', 'average_cost_for_two', 'is_delivering_now', 'has_online_delivery']
+
+with stage('carregar dados'):
+    fonte = load_source()
 
 # Sidebar
-image = Image.open('logo-filtro.jpg')
+image = load_logo('logo-filtro.jpg', 120)
 st.sidebar.image(image, width=120)
 
-country_option = st.sidebar.multiselect("Em qual país você quer encontrar um restaurante?", df1['country_name'].unique(), default=df1['country_name'].unique())
-rating_slider = st.sidebar.slider("Qual classificação de restaurante você deseja ver?", min_value=0.0, max_value=5.0, value=(0.0, 5.0), step=0.1, format="%.1f")
-culinaria_option = st.sidebar.multiselect("Escolha os tipos de culinária para análise:", options=df1['cuisines'].unique(), default=df1['cuisines'].unique())
-
-df1 = df1[df1['country_name'].isin(country_option)]
-df1 = df1[df1['aggregate_rating'].between(rating_slider[0], rating_slider[1])]
-df1 = df1[df1['cuisines'].isin(culinaria_option)]
-
-st.sidebar.download_button("Download dados", data=df1.to_csv(index=False), file_name='dados_tratados.csv', mime='text/csv')
+country_option = shared_filter(st.sidebar.multiselect, "Em qual país você quer encontrar um restaurante?", 'paises', fonte.options('country_name'), options=fonte.options('country_name'))
+rating_slider = shared_filter(st.sidebar.slider, "Qual classificação de restaurante você deseja ver?", 'nota', (0.0, 5.0), min_value=0.0, max_value=5.0, step=0.1, format="%.1f")
+culinaria_modo = shared_filter(st.sidebar.radio, "Quais culinárias considerar?", 'modo_culinarias', 'primary', options=list(CUISINE_MODES), format_func=CUISINE_MODES.get)
+opcoes_culinaria = fonte.options('cuisines') if culinaria_modo == 'primary' else fonte.listed_cuisines()
+# Uma escolha de culinárias por modo: as opções de um modo não valem no outro
+culinaria_option = shared_filter(st.sidebar.multiselect, "Escolha os tipos de culinária para análise:", f'culinarias_{culinaria_modo}', opcoes_culinaria, options=opcoes_culinaria)
+
+with stage('filtros', rows_in=fonte.size) as etapa:
+    if culinaria_modo == 'primary':
+        selecao = fonte.select(st.session_state, 'selecao', columns=COLUNAS_LINHAS, countries=country_option,
+                               rating_range=rating_slider, cuisines=culinaria_option)
+        consulta = open_query(fonte, rows=lambda: selecao.frame(RANKING_COLUMNS), countries=country_option,
+                              rating_range=rating_slider, cuisines=culinaria_option)
+    else:
+        # País e nota pelo índice de filtros, culinárias pela matriz de incidência
+        selecao = fonte.select(st.session_state, 'selecao', columns=COLUNAS_LINHAS,
+                               countries=country_option, rating_range=rating_slider)
+        incidencia = fonte.derived(selecao, build_incidence)
+        selecao = selecao.subset(incidencia.filter(selecao.positions, culinaria_option))
+        # As culinárias listadas não estão no cubo nem no snapshot: as métricas
+        # saem da matriz de incidência e os rankings das linhas explodidas,
+        # em qualquer backend
+        restaurantes = lambda: selecao.frame(RANKING_COLUMNS)
+        consulta = PandasQuery(
+            incidencia.cells(selecao.positions, culinaria_option),
+            rows=restaurantes,
+            cuisine_rows=lambda: incidencia.explode(restaurantes(), selecao.positions, culinaria_option),
+            totals=incidencia.totals(selecao.positions, culinaria_option)
+        )
+    totais = consulta.totals()
+    etapa['rows_out'] = len(selecao)
+
+download_sidebar(selecao.frame, 'culinarias', version=fonte.version, countries=country_option, rating_range=rating_slider,
+                 cuisines=culinaria_option, cuisine_mode=culinaria_modo)
 
 #-------------------------------------------------------------------------------
 # Dashboard - Culinária
@@ -129,7 +71,7 @@ st.subheader("Exploração dos Dados de Restaurantes por Tipo de Culinária")
 st.markdown("Nesta página, exploramos métricas e insights relacionados aos tipos de culinária oferecidos pelos restaurantes cadastrados.")
 
 # Métricas Gerais
-metrics = calculate_cuisine_metrics(df1)
+metrics = calculate_cuisine_metrics(totais)
 col1, col2, col3 = st.columns(3)
 with col1:
     st.metric(label="🍴 Total de Tipos de Culinária", value=metrics['tipos_culinaria'])
@@ -145,17 +87,42 @@ with col3:
     custo_culinaria,
     nota_culinaria,
     mais_online_entregas
-) = preprocess_cuisine_data(df1)
+) = preprocess_cuisine_data(consulta)
 
 # Tabela para maior e menor avaliação
 st.markdown("### Restaurantes com as Maiores e Menores Avaliações por Tipo de Culinária")
 col1, col2 = st.columns(2)
 with col1:
     st.markdown("##### Maiores Avaliações")
-    st.dataframe(maior_avaliacao.groupby('cuisines').head(1).reset_index(drop=True))
+    st.dataframe(maior_avaliacao)
 with col2:
     st.markdown("##### Menores Avaliações")
-    st.dataframe(menor_avaliacao.groupby('cuisines').head(1).reset_index(drop=True))
+    st.dataframe(menor_avaliacao)
+
+# Os rankings formam um fragmento: trocar o agrupamento, o tamanho ou os
+# empates reexecuta só esta parte, sobre a consulta da última execução
+@st.fragment
+def rankings_section(consulta):
+    # Rankings por culinária, cidade ou país
+    st.markdown("### Rankings de Restaurantes")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        grupo_ranking = st.selectbox("Agrupar por", options=list(LEADERBOARD_GROUPS), format_func=LEADERBOARD_GROUPS.get)
+    with col2:
+        tamanho_ranking = st.number_input("Restaurantes por grupo", min_value=1, max_value=20, value=RANKING_SIZE)
+    with col3:
+        manter_empates = st.checkbox("Manter empates", value=False)
+
+    melhores, piores = consulta.top_and_bottom(grupo_ranking, k=int(tamanho_ranking), keep_ties=manter_empates)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("##### Melhores")
+        st.dataframe(melhores, use_container_width=True)
+    with col2:
+        st.markdown("##### Piores")
+        st.dataframe(piores, use_container_width=True)
+
+rankings_section(consulta)
 
 # Tabela para maior custo médio, maior nota média e mais entregas
 st.markdown("### Outros Insights")
@@ -172,14 +139,8 @@ with col3:
 
 # Gráfico: Distribuição dos Tipos de Culinária
 st.markdown("### Distribuição dos Tipos de Culinária")
-culinaria_distribuicao = df1['cuisines'].value_counts().reset_index()
-culinaria_distribuicao.columns = ['Tipo de Culinária', 'Quantidade']
-fig_culinaria = create_bar_chart(
-    culinaria_distribuicao.head(10),
-    x='Tipo de Culinária',
-    y='Quantidade',
-    text='Quantidade',
-    title="Top 10 Tipos de Culinária",
-    labels={'Tipo de Culinária': 'Tipo de Culinária', 'Quantidade': 'Quantidade de Restaurantes'}
-)
+fig_culinaria = create_distribution_chart(consulta)
 st.plotly_chart(fig_culinaria, use_container_width=True)
+
+# Painel de perfil (só com FOME_ZERO_PROFILE=1 ou ?profile=1)
+finish_profiling()
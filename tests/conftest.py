@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Os testes importam fome_zero a partir da raiz do repositório
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,48 @@
+# Respostas da API local: sucesso com ETag, revalidação e erros sempre com
+# corpo JSON (400 para filtros inválidos, 500 para falhas internas).
+
+import http.client
+import json
+import threading
+
+import pytest
+
+from fome_zero import api
+
+@pytest.fixture(scope='module')
+def server():
+    server = api.make_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def get(server, path, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=60)
+    connection.request('GET', path, headers=headers or {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response.status, response.getheader('ETag'), json.loads(body) if body else None
+
+def test_totals_and_revalidation(server):
+    status, etag, payload = get(server, '/totais?paises=India&nota=3.0,4.5')
+    assert status == 200 and payload['dados']['restaurantes'] > 0
+    assert get(server, '/totais?paises=India&nota=3.0,4.5', {'If-None-Match': etag})[0] == 304
+
+@pytest.mark.parametrize('query', ['nota=', 'nota=abc', 'nota=4,3', 'nota=1,2,3', 'pais=India'])
+def test_invalid_filters(server, query):
+    status, _, payload = get(server, f'/paises?{query}')
+    assert status == 400 and payload['erro']
+
+@pytest.mark.parametrize('error, status', [(KeyError('cuisines'), 400), (ValueError("faixa"), 400), (RuntimeError("backend"), 500)])
+def test_endpoint_errors(server, monkeypatch, error, status):
+    def fail(query):
+        raise error
+
+    monkeypatch.setitem(api.API_ENDPOINTS, '/culinarias/distribuicao', fail)
+    # Filtros próprios de cada caso: respostas com erro não entram no cache
+    result = get(server, f'/culinarias/distribuicao?paises={type(error).__name__}')
+    assert result[0] == status and result[2]['erro']
+    # A conexão seguinte continua sendo atendida
+    assert get(server, '/totais')[0] == 200
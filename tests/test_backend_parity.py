@@ -0,0 +1,114 @@
+# Paridade entre os backends de consulta: as funções das páginas rodam com o
+# pandas (cubo e linhas em memória) e com o DuckDB (SQL sobre o Parquet) para
+# vários filtros, e as tabelas precisam sair idênticas. Roda sobre o dataset em
+# memória e sobre o modo particionado gerado a partir do mesmo CSV.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fome_zero import dashboard
+from fome_zero.cube import select_cells
+from fome_zero.data import DATA_PATH
+from fome_zero.leaderboards import LEADERBOARD_GROUPS
+from fome_zero.query import PandasQuery, SQLQuery
+from fome_zero.store import MemorySource, ingest_csv, load_store
+
+# Filtros aleatórios além dos casos de borda
+SAMPLES = 20
+
+# Tamanhos de ranking testados: o caminho do idxmax (k=1) e o do rank (k>1)
+RANKINGS = [(1, False), (1, True), (3, False), (3, True)]
+
+CHECKS = {
+    'calculate_country_metrics': dashboard.calculate_country_metrics,
+    'calculate_city_metrics': dashboard.calculate_city_metrics,
+    'calculate_cuisine_metrics': lambda query: dashboard.calculate_cuisine_metrics(query.totals()),
+    'preprocess_country_data': dashboard.preprocess_country_data,
+    'preprocess_city_data': dashboard.preprocess_city_data,
+    'preprocess_cuisine_data': dashboard.preprocess_cuisine_data,
+    'counts_by cuisines': lambda query: query.counts_by('cuisines'),
+    'counts_by country_name': lambda query: query.counts_by('country_name'),
+}
+for group in LEADERBOARD_GROUPS:
+    for k, keep_ties in RANKINGS:
+        name = f"top_and_bottom {group} k={k}" + (" empates" if keep_ties else "")
+        CHECKS[name] = lambda query, group=group, k=k, keep_ties=keep_ties: query.top_and_bottom(group, k, keep_ties)
+
+#-------------------------------------------------------------------------------
+# Filtros e comparação
+#-------------------------------------------------------------------------------
+
+def parity_filters(source, samples, seed=0):
+    countries = source.options('country_name')
+    cities = source.options('city')
+    cuisines = source.options('cuisines')
+
+    # Casos de borda: sem filtro, tudo marcado, nenhum país e uma faixa com
+    # ponta fracionária (o slider devolve 3.0000000000000004)
+    filters = [
+        {},
+        {'countries': countries, 'rating_range': (0.0, 5.0)},
+        {'countries': [], 'rating_range': (0.0, 5.0)},
+        {'countries': countries[:1], 'rating_range': (3.0000000000000004, 4.6)},
+    ]
+    rng = np.random.default_rng(seed)
+    for _ in range(samples):
+        low = round(float(rng.integers(0, 45)) / 10, 1)
+        filters.append({
+            'countries': list(rng.choice(countries, int(rng.integers(1, len(countries) + 1)), replace=False)),
+            'rating_range': (low, round(float(rng.integers(low * 10, 51)) / 10, 1)),
+            'cities': list(rng.choice(cities, int(rng.integers(1, len(cities) + 1)), replace=False)),
+            'cuisines': list(rng.choice(cuisines, int(rng.integers(1, len(cuisines) + 1)), replace=False)),
+        })
+    return filters
+
+def normalized(result):
+    # Rótulos categóricos (pandas) e texto (DuckDB) comparam como texto
+    if isinstance(result, pd.Series):
+        result = result.reset_index()
+    if isinstance(result, pd.DataFrame):
+        result = result.reset_index(drop=True)
+        return result.astype({column: object for column in result.select_dtypes('category')})
+    return result
+
+def same_result(expected, actual):
+    if isinstance(expected, tuple):
+        return len(expected) == len(actual) and all(same_result(a, b) for a, b in zip(expected, actual))
+    if isinstance(expected, dict):
+        return expected.keys() == actual.keys() and all(same_result(expected[key], actual[key]) for key in expected)
+    if isinstance(expected, (pd.Series, pd.DataFrame)):
+        try:
+            pd.testing.assert_frame_equal(normalized(expected), normalized(actual), check_dtype=False, rtol=1e-12)
+        except AssertionError:
+            return False
+        return True
+    return expected == actual or (pd.isna(expected) and pd.isna(actual)) or bool(np.isclose(expected, actual, rtol=1e-12))
+
+#-------------------------------------------------------------------------------
+# Fontes e testes
+#-------------------------------------------------------------------------------
+
+@pytest.fixture(scope='module', params=['memoria', 'particoes'])
+def source(request, tmp_path_factory):
+    if request.param == 'memoria':
+        return MemorySource()
+    store_dir = str(tmp_path_factory.mktemp('paridade') / 'store')
+    ingest_csv(DATA_PATH, store_dir)
+    return load_store(store_dir)
+
+@pytest.fixture(scope='module')
+def queries(source):
+    # (filtros, consulta pandas, consulta SQL) de cada filtro, montadas uma vez
+    pairs = []
+    for filters in parity_filters(source, SAMPLES):
+        rows = source.select({}, 'paridade', columns=dashboard.RANKING_COLUMNS, **filters).frame(dashboard.RANKING_COLUMNS)
+        table = source.sql_table(filters.get('countries'))
+        pairs.append((filters, PandasQuery(select_cells(source.cube, **filters), rows), SQLQuery(table, filters)))
+    return pairs
+
+@pytest.mark.parametrize('check', list(CHECKS))
+def test_backends_agree(check, queries):
+    diverging = [filters for filters, pandas_query, sql_query in queries
+                 if not same_result(CHECKS[check](pandas_query), CHECKS[check](sql_query))]
+    assert diverging == []
@@ -0,0 +1,53 @@
+# Páginas com seleções vazias: nenhum país, nenhuma cidade ou culinária e uma
+# faixa de notas sem restaurantes, nos dois modos de culinária e nos dois
+# backends de consulta. Cada caso roda a página via AppTest e não pode terminar
+# com exceção.
+
+import glob
+import os
+
+import pytest
+
+from fome_zero.query import BACKEND_ENV, QUERY_BACKENDS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Faixa sem nenhum restaurante no dataset (notas vão de 0 e depois de 1.8 a 4.9)
+EMPTY_RATING = (0.5, 1.0)
+
+# (página, modo de culinária, filtro esvaziado)
+CASES = [
+    ('1_*.py', None, 'paises'),
+    ('1_*.py', None, 'nota'),
+    ('2_*.py', None, 'paises'),
+    ('2_*.py', None, 'nota'),
+    ('3_*.py', None, 'paises'),
+    ('3_*.py', None, 'cidades'),
+    ('3_*.py', None, 'nota'),
+    ('4_*.py', 'primary', 'paises'),
+    ('4_*.py', 'primary', 'culinarias'),
+    ('4_*.py', 'primary', 'nota'),
+    ('4_*.py', 'listed', 'paises'),
+    ('4_*.py', 'listed', 'culinarias'),
+    ('4_*.py', 'listed', 'nota'),
+]
+
+@pytest.mark.parametrize('backend', list(QUERY_BACKENDS))
+@pytest.mark.parametrize('pattern, mode, emptied', CASES)
+def test_empty_selection(backend, pattern, mode, emptied, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    # O AppTest resolve caminhos relativos (logos) a partir do diretório atual
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setenv(BACKEND_ENV, backend)
+
+    page = glob.glob(os.path.join(ROOT, 'pages', pattern))[0]
+    at = AppTest.from_file(page, default_timeout=300).run()
+    if mode is not None:
+        at.sidebar.radio(key='_filtro_modo_culinarias').set_value(mode).run()
+    if emptied == 'nota':
+        at.sidebar.slider(key='_filtro_nota').set_value(EMPTY_RATING).run()
+    else:
+        key = f'_filtro_{emptied}_{mode}' if emptied == 'culinarias' else f'_filtro_{emptied}'
+        at.sidebar.multiselect(key=key).set_value([]).run()
+    assert [exception.message for exception in at.exception] == []
@@ -0,0 +1,80 @@
+# Ingestão incremental: o cubo atualizado por subtração e soma tem que ser o
+# mesmo cubo construído do zero, e os deltas aplicados sobrevivem a qualquer
+# reconstrução a partir do CSV.
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from fome_zero.cube import build_cube
+from fome_zero.data import DATA_PATH, clean_data, clear_cache, load_and_clean_data
+from fome_zero.ingest import apply_delta, merge_frames, split_upsert, update_cube
+from fome_zero.store import PartitionStore, ingest_csv
+
+def make_delta(raw):
+    # Substitui ids repetidos e únicos do CSV (mudando de cidade, culinária e
+    # faixa de nota), acrescenta ids novos e repete ids dentro do próprio delta
+    ids = raw['Restaurant ID']
+    repeated = ids[ids.duplicated()].unique()[:3]
+    single = ids[~ids.duplicated(keep=False)].unique()[:3]
+
+    replaced = raw[ids.isin(repeated)].drop_duplicates('Restaurant ID').copy()
+    replaced['Aggregate rating'] = [0.0, 4.9, 2.1]
+    replaced['Votes'] += 1000
+    moved = raw[ids.isin(single)].copy()
+    moved[['City', 'Cuisines', 'Country Code']] = raw.iloc[-1][['City', 'Cuisines', 'Country Code']].tolist()
+
+    added = raw.iloc[:3].copy()
+    added['Restaurant ID'] = ids.max() + pd.Series([1, 2, 3], index=added.index)
+    added['Cuisines'] = 'Cozinha Nova'
+
+    # Segunda versão de um id substituído e de um id novo: vale a última
+    again = pd.concat([replaced.iloc[:1], added.iloc[:1]]).assign(**{'Aggregate rating': 3.3, 'Votes': 7})
+    return pd.concat([replaced, moved, added, again], ignore_index=True)
+
+@pytest.fixture(scope='module')
+def raw():
+    return pd.read_csv(DATA_PATH)
+
+def test_update_cube_matches_rebuild(raw):
+    df = clean_data(raw)
+    kept, removed, added = split_upsert(df, clean_data(make_delta(raw)))
+    merged = merge_frames(kept, added)
+
+    updated = update_cube(build_cube(df), removed, added)
+    rebuilt = build_cube(merged)
+    # Ids com várias linhas saem inteiros
+    assert len(removed) > removed['restaurant_id'].nunique()
+    pd.testing.assert_frame_equal(
+        updated.astype({'country_name': object, 'city': object, 'cuisines': object}),
+        rebuilt.astype({'country_name': object, 'city': object, 'cuisines': object}),
+        check_dtype=False,
+    )
+
+def test_deltas_survive_rebuild_from_csv(raw, tmp_path):
+    csv_path = str(tmp_path / 'zomato.csv')
+    shutil.copy(DATA_PATH, csv_path)
+    delta_path = str(tmp_path / 'delta.csv')
+    make_delta(raw).to_csv(delta_path, index=False)
+
+    kept, _, added = split_upsert(clean_data(raw), clean_data(make_delta(raw)))
+    expected = merge_frames(kept, added)['restaurant_id'].tolist()
+
+    apply_delta(delta_path, csv_path)
+    merged = load_and_clean_data(csv_path)
+    assert merged['restaurant_id'].tolist() == expected
+
+    # CSV tocado (cópia, novo download): a carga volta ao CSV e reaplica o log
+    os.utime(csv_path)
+    clear_cache()
+    reloaded = load_and_clean_data(csv_path)
+    assert reloaded['restaurant_id'].tolist() == expected
+    assert reloaded['aggregate_rating'].tolist() == merged['aggregate_rating'].tolist()
+
+    # O modo particionado também parte do CSV e do log
+    summary = ingest_csv(csv_path, str(tmp_path / 'zomato_store'), chunk_rows=1000)
+    store = PartitionStore(summary['diretorio'])
+    assert store.read(['restaurant_id'])['restaurant_id'].tolist() == expected
+    clear_cache()
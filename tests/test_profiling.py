@@ -0,0 +1,55 @@
+# Perfil por etapa: a memória só é registrada quando uma única execução com
+# perfil está aberta, e o tracemalloc é desligado quando a última termina.
+
+import threading
+import tracemalloc
+
+import pytest
+
+from fome_zero.profiling import PROFILE_ENV, finish_profiling, stage, start_profiling
+
+@pytest.fixture(autouse=True)
+def profiling(monkeypatch, tmp_path):
+    monkeypatch.setenv(PROFILE_ENV, '1')
+    # O log JSON-lines vai para o diretório atual
+    monkeypatch.chdir(tmp_path)
+
+def test_single_run_records_memory():
+    start_profiling('teste')
+    with stage('externa') as outer:
+        with stage('interna') as inner:
+            data = bytearray(4 * 1024 ** 2)
+        del data
+    profiler = finish_profiling()
+
+    assert profiler.stages == [outer, inner]
+    assert inner['memory_peak'] >= 4 * 1024 ** 2 and outer['memory_peak'] >= inner['memory_peak']
+    assert not tracemalloc.is_tracing()
+
+def test_concurrent_runs_leave_memory_blank():
+    inside, done = threading.Event(), threading.Event()
+    records = {}
+
+    def other_session():
+        start_profiling('outra')
+        inside.wait()
+        with stage('outra etapa') as record:
+            records['outra'] = record
+        finish_profiling()
+        done.set()
+
+    start_profiling('teste')
+    with stage('antes') as before:
+        pass
+    thread = threading.Thread(target=other_session)
+    thread.start()
+    with stage('durante') as during:
+        inside.set()
+        done.wait()
+    finish_profiling()
+    thread.join()
+
+    assert before['memory_peak'] is not None
+    assert during['memory_peak'] is None and during['memory_delta'] is None
+    assert records['outra']['memory_peak'] is None
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,36 @@
+# Relatórios pré-calculados: cada resposta gravada em consultas.json volta
+# idêntica à da consulta ao vivo, sem arredondar floats.
+
+import json
+
+import pandas as pd
+import pytest
+
+from fome_zero import dashboard
+from fome_zero.query import live_query
+from fome_zero.report import RecordingQuery, decode_result, encode_result, page_sections, report_views
+from fome_zero.store import load_source
+
+def assert_identical(expected, actual):
+    if isinstance(expected, tuple):
+        assert len(expected) == len(actual)
+        for a, b in zip(expected, actual):
+            assert_identical(a, b)
+    elif isinstance(expected, pd.Series):
+        pd.testing.assert_series_equal(expected.astype(object) if expected.dtype == 'category' else expected, actual, check_exact=True)
+    elif isinstance(expected, pd.DataFrame):
+        expected = expected.astype({column: object for column in expected.select_dtypes('category')})
+        pd.testing.assert_frame_equal(expected, actual, check_exact=True)
+    else:
+        assert expected == actual
+
+@pytest.mark.parametrize('slug', ['global', 'india', 'brazil'])
+def test_answers_round_trip(slug):
+    source = load_source()
+    filters = dict(report_views(source))[slug]
+    selection = source.select({}, 'relatorio', columns=dashboard.RANKING_COLUMNS, **filters)
+    query = RecordingQuery(live_query(source, rows=lambda: selection.frame(dashboard.RANKING_COLUMNS), **filters))
+    page_sections(query)
+
+    for key, answer in query.answers.items():
+        assert_identical(answer, decode_result(json.loads(json.dumps(encode_result(answer)))))
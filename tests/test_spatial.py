@@ -0,0 +1,56 @@
+# Consultas por área visível: o índice em grade e os níveis de densidade têm
+# que devolver os mesmos pontos de uma varredura completa, inclusive com a área
+# cruzando a linha de data ou com o mapa arrastado para outra cópia do mundo.
+
+import numpy as np
+import pytest
+
+from fome_zero.density import DensityLevels
+from fome_zero.geo import haversine_km, nearest_positions, wrap_longitude
+from fome_zero.spatial import GridIndex
+
+# (sul, oeste, norte, leste) como o Leaflet devolve
+BOUNDS = [
+    (-90.0, -180.0, 90.0, 180.0),
+    (-50.0, -30.0, 60.0, 40.0),
+    (-60.0, 170.0, 10.0, 190.0),
+    (-60.0, -200.0, 10.0, -160.0),
+    (-60.0, 530.0, 10.0, 550.0),
+    (-10.0, 100.0, 40.0, 500.0),
+    (20.0, -400.0, 30.0, 100.0),
+]
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(0)
+    latitude = rng.uniform(-80, 80, 20_000)
+    longitude = np.concatenate([rng.uniform(-180, 180, 18_000), rng.uniform(175, 180, 1_000), rng.uniform(-180, -175, 1_000)])
+    return latitude, longitude
+
+def inside(latitude, longitude, bounds):
+    # Varredura completa: a longitude de cada ponto medida a partir do oeste
+    south, west, north, east = bounds
+    offset = (longitude - west) % 360
+    return (latitude >= south) & (latitude <= north) & ((east - west >= 360) | (offset <= east - west))
+
+@pytest.mark.parametrize('bounds', BOUNDS)
+def test_grid_query_matches_scan(points, bounds):
+    latitude, longitude = points
+    expected = np.flatnonzero(inside(latitude, longitude, bounds))
+    assert len(expected)
+    np.testing.assert_array_equal(GridIndex(latitude, longitude).query(*bounds), expected)
+
+@pytest.mark.parametrize('bounds', BOUNDS)
+def test_density_cells_match_scan(points, bounds):
+    levels = DensityLevels(*points)
+    level = levels.cells(4)
+    cells = levels.cells(4, bounds)
+    assert len(cells['value']) == inside(level['latitude'], level['longitude'], bounds).sum() > 0
+
+def test_nearby_across_the_date_line(points):
+    latitude, longitude = points
+    index = GridIndex(latitude, longitude)
+    positions, distances = nearest_positions(index, -20.0, wrap_longitude(539.9), radius_km=800, k=None)
+    expected = np.flatnonzero(haversine_km(-20.0, 179.9, latitude, longitude) <= 800)
+    assert len(expected) and (longitude[expected] < 0).any()
+    np.testing.assert_array_equal(np.sort(positions), expected)